@@ -1,5 +1,6 @@
+from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING, UpdateOne
 from app.config import settings
 import logging
 
@@ -27,6 +28,9 @@ class Database:
             # Create indexes
             await cls.create_indexes()
 
+            # One-time data fixes
+            await cls.run_migrations()
+
         except Exception as e:
             cls.client = None
             logger.critical(f"❌ Failed to connect to MongoDB: {e}")
@@ -81,7 +85,48 @@ class Database:
         await db.notifications.create_index([("created_at", DESCENDING)])
         await db.notifications.create_index([("is_read", ASCENDING)])
 
+        # Outfit history (personalization reads by user)
+        await db.outfit_history.create_index(
+            [("user_id", ASCENDING), ("_id", DESCENDING)]
+        )
+
+        # Push logs
+        await db.push_logs.create_index(
+            [("user_id", ASCENDING), ("sent_at", DESCENDING)]
+        )
+        # Receipt updates look logs up by Expo ticket id
+        await db.push_logs.create_index("tickets.ticket_id", sparse=True)
+
         logger.info("✅ Database indexes created successfully")
+
+    @classmethod
+    async def run_migrations(cls):
+        """Apply data migrations not yet recorded in the migrations collection"""
+        db = cls.get_database()
+
+        if await db.migrations.find_one({"_id": "normalize_push_tokens"}) is None:
+            await cls._normalize_push_tokens(db)
+            await db.migrations.update_one(
+                {"_id": "normalize_push_tokens"},
+                {"$set": {"applied_at": datetime.utcnow()}},
+                upsert=True
+            )
+
+    @staticmethod
+    async def _normalize_push_tokens(db):
+        """Rewrite legacy push_tokens (single strings, invalid or duplicate entries) as senders read them raw"""
+        from app.services.push_notification_service import normalize_push_tokens
+
+        updates = []
+        cursor = db.users.find({"push_tokens": {"$exists": True}}, projection={"push_tokens": 1})
+        async for user in cursor:
+            tokens = normalize_push_tokens(user["push_tokens"])
+            if tokens != user["push_tokens"]:
+                updates.append(UpdateOne({"_id": user["_id"]}, {"$set": {"push_tokens": tokens}}))
+
+        if updates:
+            await db.users.bulk_write(updates, ordered=False)
+        logger.info(f"✅ Normalized push tokens for {len(updates)} users")
 # app/database.py - Add index creation
 
 async def create_indexes():
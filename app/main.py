@@ -64,6 +64,15 @@ async def lifespan(app: FastAPI):
     await notification_scheduler.stop()
     logger.info("🔕 Notification scheduler stopped")
 
+    from app.services.push_notification_service import push_notification_service
+
+    await push_notification_service.aclose()
+
+    from app.services.weather_service import weather_service
+
+    weather_service.close()
+    await weather_service.aclose()
+
     await Database.close_db()
     logger.info("✅ Application shutdown complete")
 
@@ -10,6 +10,7 @@ import traceback
 from app.utils.auth import get_current_user
 from app.services.personalized_ai_service import PersonalizedAIService
 from app.database import get_database
+from app.utils.responses import ORJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -76,7 +77,8 @@ async def get_personalized_recommendations(
                 }
             }
 
-        return result
+        # Service result holds raw Mongo documents; orjson stringifies ObjectIds
+        return ORJSONResponse(content=result)
 
     except HTTPException:
         raise
@@ -109,7 +111,7 @@ async def analyze_outfit_coherence(
 
         if location:
             from app.services.weather_service import weather_service
-            weather = weather_service.get_current_weather(location)
+            weather = await weather_service.aget_current_weather(location)
             if weather:
                 weather_data = {
                     "temperature": weather.get("temperature"),
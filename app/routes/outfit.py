@@ -44,7 +44,7 @@ async def get_outfit_suggestions(
                     "category": weather_service.get_temperature_category(temperature or 20)
                 }
             else:
-                weather_data = weather_service.get_weather_with_category(location)
+                weather_data = await weather_service.aget_weather_with_category(location)
         
         # Generate outfit suggestions
         suggestions = await outfit_service.generate_suggestions(
@@ -82,7 +82,7 @@ async def test_outfit_suggestions(
     try:
         user_id = "test_user_123"
         
-        weather_data = weather_service.get_weather_with_category(location)
+        weather_data = await weather_service.aget_weather_with_category(location)
         
         suggestions = await outfit_service.generate_suggestions(
             user_id=user_id,
@@ -486,7 +486,7 @@ async def get_weather_based_suggestions(
     try:
         user_id = current_user["_id"]
         
-        weather = weather_service.get_weather_with_category(location)
+        weather = await weather_service.aget_weather_with_category(location)
         
         if not weather:
             raise HTTPException(status_code=400, detail=f"Could not get weather for {location}")
@@ -7,6 +7,7 @@ import logging
 
 from app.database import get_database
 from app.utils.auth import get_current_user
+from app.services.personalized_ai_service import PersonalizedAIService
 from app.models.outfit_history import (
     OutfitHistoryCreate,
     OutfitHistoryUpdate,
@@ -18,6 +19,8 @@ from app.models.outfit_history import (
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/outfit-history", tags=["Outfit History"])
 
+ai_service = PersonalizedAIService()
+
 # ============================================
 # CREATE OUTFIT HISTORY
 # ============================================
@@ -80,6 +83,16 @@ async def create_outfit_history(
             {"$inc": {"wear_count": 1}}
         )
         
+        # Feed the wear (and any rating/favorite) into the user's taste vector
+        await ai_service.update_taste_vector(
+            str(current_user["_id"]),
+            outfit_doc["outfit_items"],
+            rating=outfit_data.rating,
+            is_favorite=outfit_data.is_favorite,
+            history_id=result.inserted_id,
+            occasion=outfit_data.occasion
+        )
+        
         # Fetch and return created document
         created_outfit = await db.outfit_history.find_one({"_id": result.inserted_id})
         created_outfit["_id"] = str(created_outfit["_id"])
@@ -272,21 +285,35 @@ async def update_outfit_history(
         
         update_dict["updated_at"] = datetime.utcnow()
         
-        # Update document
-        result = await db.outfit_history.find_one_and_update(
+        # Update document (previous version kept for the taste vector's rating swap)
+        previous = await db.outfit_history.find_one_and_update(
             {
                 "_id": ObjectId(outfit_id),
                 "user_id": current_user["_id"]
             },
             {"$set": update_dict},
-            return_document=True
+            return_document=False
         )
         
-        if not result:
+        if not previous:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Outfit history not found"
             )
+        result = {**previous, **update_dict}
+        
+        # Feed rating/favorite changes into the user's taste vector
+        if "rating" in update_dict or "is_favorite" in update_dict:
+            await ai_service.update_taste_vector(
+                str(current_user["_id"]),
+                result.get("outfit_items", []),
+                rating=result.get("rating"),
+                is_favorite=result.get("is_favorite", False),
+                history_id=result["_id"],
+                occasion=result.get("occasion"),
+                is_new=False,
+                previous_rating=previous.get("rating")
+            )
         
         result["_id"] = str(result["_id"])
         
@@ -326,6 +353,9 @@ async def delete_outfit_history(
                 detail="Outfit history not found"
             )
         
+        # Stored counters still include this outfit; rebuild from history on the next update
+        await ai_service.reset_taste_vector(str(current_user["_id"]))
+        
         logger.info(f"✅ Outfit history deleted: {outfit_id}")
         
     except HTTPException:
@@ -12,7 +12,11 @@ from app.models.push_notification import (
     PushNotificationData,
     NotificationSettings
 )
-from app.services.push_notification_service import push_notification_service
+from app.services.push_notification_service import (
+    push_notification_service,
+    invalidate_user,
+    normalize_push_tokens
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/push", tags=["Push Notifications"])
@@ -38,16 +42,19 @@ async def register_push_token(
         logger.info(f"📱 Registering push token for user: {current_user['email']}")
         
         # Get existing tokens
-        user = await db.users.find_one({"_id": ObjectId(current_user["_id"])})
-        existing_tokens = user.get("push_tokens", [])
-        
-        # Ensure it's a list
-        if isinstance(existing_tokens, str):
-            existing_tokens = [existing_tokens]
+        user = await db.users.find_one(
+            {"_id": ObjectId(current_user["_id"])},
+            {"push_tokens": 1}
+        )
+        stored_tokens = user.get("push_tokens", [])
         
-        # Add new token if not already present
+        # Normalize on write: list of unique, valid Expo tokens
+        existing_tokens = normalize_push_tokens(stored_tokens)
         if token_data.token not in existing_tokens:
             existing_tokens.append(token_data.token)
+        
+        # Save if the token is new or the stored list needed cleaning up
+        if existing_tokens != stored_tokens:
             
             # Update user document
             await db.users.update_one(
@@ -59,6 +66,7 @@ async def register_push_token(
                     }
                 }
             )
+            invalidate_user(current_user["_id"])
             
             logger.info(f"✅ Push token registered successfully")
         else:
@@ -93,6 +101,7 @@ async def remove_push_token(
             {"_id": ObjectId(current_user["_id"])},
             {"$pull": {"push_tokens": token}}
         )
+        invalidate_user(current_user["_id"])
         
         if result.modified_count > 0:
             logger.info(f"✅ Push token removed")
@@ -134,6 +143,7 @@ async def update_notification_settings(
             {"$set": {"notification_settings": settings_dict}},
             return_document=True
         )
+        invalidate_user(current_user["_id"])
         
         logger.info(f"✅ Notification settings updated")
         
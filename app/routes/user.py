@@ -3,6 +3,7 @@ from app.middleware.auth_middleware import get_current_user
 from app.database import get_database
 from app.models.user import UserResponse, UserUpdate, PasswordChange
 from app.services.image_service import image_service
+from app.services.push_notification_service import invalidate_user
 from app.utils.validators import Validators, raise_validation_error
 from bson import ObjectId
 from typing import Optional
@@ -90,6 +91,9 @@ async def update_profile(
         
         if result.modified_count == 0:
             logger.warning(f"No changes made to user {user_id}")
+        else:
+            # Location feeds daily reminders; drop the cached notification user
+            invalidate_user(user_id)
         
         # Fetch updated user
         updated_user = await db.users.find_one({"_id": ObjectId(user_id)})
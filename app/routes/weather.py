@@ -34,7 +34,7 @@ async def get_current_weather(
         # Get weather data
         weather_data = None
         try:
-            weather_data = weather_service.get_current_weather(location)
+            weather_data = await weather_service.aget_current_weather(location)
         except Exception as e:
             logger.warning(f"Weather API failed: {e}")
         
@@ -103,7 +103,7 @@ async def get_forecast(
             if user and user.get("location"):
                 location = user["location"]
         
-        forecast = weather_service.get_forecast(location, days)
+        forecast = await weather_service.aget_forecast(location, days)
         
         if not forecast:
             raise HTTPException(
@@ -143,7 +143,7 @@ async def get_clothing_recommendations(
             if user and user.get("location"):
                 location = user["location"]
         
-        weather_data = weather_service.get_current_weather(location)
+        weather_data = await weather_service.aget_current_weather(location)
         
         if not weather_data:
             raise HTTPException(
@@ -198,7 +198,7 @@ async def get_weather_outfit_recommendations(
             }
         else:
             # Get real weather
-            weather_data = weather_service.get_current_weather(location)
+            weather_data = await weather_service.aget_current_weather(location)
             if not weather_data:
                 raise HTTPException(status_code=404, detail="Weather data not found")
             
@@ -239,12 +239,12 @@ async def get_hourly_forecast(
     """
     try:
         # First get coordinates
-        location_info = weather_service.get_coordinates(location)
+        location_info = await weather_service.aget_coordinates(location)
         if not location_info:
             raise HTTPException(status_code=404, detail="Location not found")
         
         # Get hourly forecast
-        hourly_forecast = weather_service.get_hourly_forecast(
+        hourly_forecast = await weather_service.aget_hourly_forecast(
             location_info["latitude"],
             location_info["longitude"],
             hours
@@ -269,7 +269,7 @@ class OutfitService:
             
             # Get weather data if location provided
             if location and not weather_data:
-                weather_data = weather_service.get_current_weather(location)
+                weather_data = await weather_service.aget_current_weather(location)
                 if weather_data:
                     weather_data['category'] = weather_service.get_temperature_category(
                         weather_data.get('temperature', 20)
@@ -21,12 +21,242 @@ from bson import ObjectId
 import logging
 from datetime import datetime, timedelta
 from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+import heapq
+import re
+from itertools import islice, product
+import numpy as np
 
 from app.database import Database
 from app.services.weather_service import weather_service
 
 logger = logging.getLogger(__name__)
 
+# Per-category candidate limits for outfit generation (after pre-ranking)
+TOP_CANDIDATES = 8
+BOTTOM_CANDIDATES = 8
+SHOE_CANDIDATES = 4
+DRESS_CANDIDATES = 8
+
+# Stop generating combinations for a strategy once this many have been built
+MAX_OUTFIT_CANDIDATES = 200
+
+# Wardrobe items are returned to the client, so only drop the CLIP vector
+WARDROBE_PROJECTION = {"embedding": 0}
+# History entries are only read by _analyze_user_history
+HISTORY_PROJECTION = {"outfit_items": 1, "is_favorite": 1, "rating": 1, "occasion": 1}
+CURSOR_BATCH_SIZE = 500
+
+# Style scoring keywords
+WARM_MATERIALS = frozenset({"wool", "fleece", "down", "thermal", "knit"})
+LIGHT_MATERIALS = frozenset({"cotton", "linen", "breathable", "light"})
+OCCASION_KEYWORDS = {
+    "formal": ["suit", "dress", "blazer", "tie", "heels"],
+    "casual": ["jeans", "t-shirt", "sneakers", "shorts"],
+    "business": ["trousers", "shirt", "blazer", "slacks"]
+}
+# One alternation per occasion; matches if any keyword is a substring of the item name
+OCCASION_PATTERNS = {
+    occasion: re.compile("|".join(map(re.escape, keywords)))
+    for occasion, keywords in OCCASION_KEYWORDS.items()
+}
+
+# Taste vector EMA: learning rate for items in a rated outfit, decay for the rest
+TASTE_LEARNING_RATE = 0.15
+TASTE_DECAY = 0.05
+TASTE_MIN_SCORE = 0.01
+# Optimistic-concurrency attempts for one taste vector update (guarded on taste_vector.events)
+TASTE_UPDATE_RETRIES = 3
+
+
+def _user_key(user_id: str) -> Any:
+    """user_id as stored: ObjectId when it parses as one, else the raw string"""
+    return ObjectId(user_id) if ObjectId.is_valid(user_id) else user_id
+
+
+def _user_id_match(user_id: str) -> Any:
+    """Query value matching user_id stored as either ObjectId or raw string (routes store the string)"""
+    if ObjectId.is_valid(user_id):
+        return {"$in": [ObjectId(user_id), user_id]}
+    return user_id
+
+
+def _as_string(field: str) -> Dict[str, Any]:
+    """Aggregation expression for str(value); missing or non-scalar (array/object) as empty"""
+    return {"$convert": {"input": field, "to": "string", "onError": "", "onNull": ""}}
+
+
+def _normalized_value(value: Any) -> str:
+    """Python twin of _normalized: str(value).lower().strip(), None as empty"""
+    return "" if value is None else str(value).lower().strip()
+
+
+def _field_key(value: Any) -> Optional[str]:
+    """value as a taste vector map key, or None when Mongo can't store it as a field name"""
+    if value is None:
+        return None
+    key = str(value)
+    if not key or "." in key or key.startswith("$"):
+        return None
+    return key
+
+
+def _has_taste_vector(taste_vector: Optional[Dict[str, Any]]) -> bool:
+    """True for a seeded taste vector that also carries the wear counters"""
+    return bool(taste_vector and taste_vector.get("events") and "occasions" in taste_vector)
+
+
+def _top(counts: Dict[str, float], n: int) -> List[Tuple[str, float]]:
+    """The n highest-scoring (key, score) pairs"""
+    return sorted(counts.items(), key=lambda x: x[1], reverse=True)[:n]
+
+
+def _normalized(field: str) -> Dict[str, Any]:
+    """Aggregation expression for str(value).lower().strip(), missing as empty"""
+    return {"$trim": {"input": {"$toLower": _as_string(field)}}}
+
+
+def _preferences_pipeline(user_key: Any) -> List[Dict[str, Any]]:
+    """$facet pipeline mirroring _analyze_user_history's counting rules"""
+    # Favorite = 5, else rating, else 3
+    outfit_score = {"$cond": [
+        {"$eq": ["$is_favorite", True]},
+        5,
+        {"$cond": [{"$gt": ["$rating", 0]}, "$rating", 3]}
+    ]}
+    rating_or_null = {"$cond": [{"$gt": ["$rating", 0]}, "$rating", None]}
+
+    return [
+        {"$match": {"user_id": user_key, "outfit_items.0": {"$exists": True}}},
+        {"$facet": {
+            "colors": [
+                {"$unwind": "$outfit_items"},
+                {"$project": {"color": _normalized("$outfit_items.color"), "score": outfit_score}},
+                {"$match": {"color": {"$nin": ["", "none", "unknown"]}}},
+                {"$group": {"_id": "$color", "score": {"$sum": "$score"}}},
+                {"$sort": {"score": -1}},
+                {"$limit": 10}
+            ],
+            "color_ratings": [
+                {"$unwind": "$outfit_items"},
+                {"$project": {"color": _normalized("$outfit_items.color"), "rating": rating_or_null}},
+                {"$match": {"color": {"$nin": ["", "none", "unknown"]}}},
+                {"$group": {"_id": "$color", "avg_rating": {"$avg": "$rating"}}}
+            ],
+            "combinations": [
+                {"$project": {"categories": {"$filter": {
+                    "input": {"$map": {
+                        "input": "$outfit_items",
+                        "as": "item",
+                        "in": _normalized("$$item.category")
+                    }},
+                    "as": "category",
+                    "cond": {"$ne": ["$$category", ""]}
+                }}}},
+                # At least two categorized items (not necessarily distinct)
+                {"$match": {"categories.1": {"$exists": True}}},
+                # Distinct categories, sorted, per outfit (unwind/sort/push: $sortArray needs MongoDB 5.2+)
+                {"$unwind": "$categories"},
+                {"$group": {"_id": {"outfit": "$_id", "category": "$categories"}}},
+                {"$sort": {"_id.category": 1}},
+                {"$group": {"_id": "$_id.outfit", "categories": {"$push": "$_id.category"}}},
+                {"$group": {
+                    "_id": {"$reduce": {
+                        "input": "$categories",
+                        "initialValue": "",
+                        "in": {"$cond": [
+                            {"$eq": ["$$value", ""]},
+                            "$$this",
+                            {"$concat": ["$$value", "+", "$$this"]}
+                        ]}
+                    }},
+                    "n": {"$sum": 1}
+                }},
+                {"$sort": {"n": -1}},
+                {"$limit": 5}
+            ],
+            "items": [
+                {"$unwind": "$outfit_items"},
+                {"$project": {"item_id": _as_string("$outfit_items.id")}},
+                {"$match": {"item_id": {"$ne": ""}}},
+                {"$group": {"_id": "$item_id", "n": {"$sum": 1}}},
+                {"$sort": {"n": -1}},
+                {"$limit": 10}
+            ],
+            "categories": [
+                {"$unwind": "$outfit_items"},
+                {"$project": {"category": _normalized("$outfit_items.category")}},
+                {"$match": {"category": {"$ne": ""}}},
+                {"$group": {"_id": "$category", "n": {"$sum": 1}}},
+                {"$sort": {"n": -1}},
+                {"$limit": 5}
+            ],
+            "occasions": [
+                # Missing defaults to casual; explicit null or empty is skipped, as in Python
+                {"$project": {"occasion": {"$cond": [
+                    {"$eq": [{"$type": "$occasion"}, "missing"]}, "casual", "$occasion"
+                ]}}},
+                {"$match": {"occasion": {"$nin": [None, ""]}}},
+                {"$group": {"_id": "$occasion", "n": {"$sum": 1}}}
+            ]
+        }}
+    ]
+
+
+@lru_cache(maxsize=1024)
+def _favorite_colors_hint(colors: Tuple[str, ...]) -> str:
+    return f"Try incorporating your favorite colors: {', '.join(colors)}"
+
+
+@lru_cache(maxsize=1024)
+def _preferred_combo_hint(combo: str) -> str:
+    return f"You usually prefer {combo.replace('+', ' with ')} combinations"
+
+
+def _category_combo_key(items: List[Dict[str, Any]]) -> Optional[str]:
+    """Sorted "+"-joined categories, as counted in history (needs 2+ categorized items)"""
+    categories = [
+        str(item.get("category", "")).lower()
+        for item in items
+        if item.get("category")
+    ]
+    if len(categories) < 2:
+        return None
+    return "+".join(sorted(set(categories)))
+
+
+@dataclass(slots=True)
+class Outfit:
+    """Candidate outfit carried through generation, scoring and reasoning"""
+    items: List[Dict[str, Any]]
+    type: str
+    style_score: float = 50.0
+    personalized_score: Optional[float] = None
+    combined_score: Optional[float] = None
+    history_based: bool = False
+    reasoning: Optional[str] = None
+    combo_key: Optional[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Items don't change once an outfit is built, so derive the key once
+        self.combo_key = _category_combo_key(self.items)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Response shape; scores and reasoning only appear once set"""
+        data = {
+            "items": self.items,
+            "type": self.type,
+            "style_score": self.style_score,
+            "history_based": self.history_based
+        }
+        if self.personalized_score is not None:
+            data["personalized_score"] = self.personalized_score
+            data["combined_score"] = self.combined_score
+        if self.reasoning is not None:
+            data["reasoning"] = self.reasoning
+        return data
+
 
 class PersonalizedAIService:
     """Enhanced AI service with history-based personalized recommendations"""
@@ -69,14 +299,12 @@ class PersonalizedAIService:
                 logger.error(f"❌ Error fetching user: {user_error}", exc_info=True)
                 return {"success": False, "error": f"Error fetching user: {str(user_error)}"}
 
-            # ✅ Fetch wardrobe (try both ObjectId and string)
+            # ✅ Fetch wardrobe (ObjectId or legacy string user_id)
             try:
-                try:
-                    wardrobe_cursor = db.clothing_items.find({"user_id": ObjectId(user_id)})
-                    wardrobe_items = await wardrobe_cursor.to_list(length=None)
-                except:
-                    wardrobe_cursor = db.clothing_items.find({"user_id": user_id})
-                    wardrobe_items = await wardrobe_cursor.to_list(length=None)
+                wardrobe_cursor = db.clothing_items.find(
+                    {"user_id": _user_key(user_id)}, projection=WARDROBE_PROJECTION
+                ).batch_size(CURSOR_BATCH_SIZE)
+                wardrobe_items = await wardrobe_cursor.to_list(length=None)
                 
                 logger.info(f"✅ Found {len(wardrobe_items)} wardrobe items")
                 
@@ -90,31 +318,31 @@ class PersonalizedAIService:
                 logger.error(f"❌ Error fetching wardrobe: {wardrobe_error}", exc_info=True)
                 return {"success": False, "error": f"Error fetching wardrobe: {str(wardrobe_error)}"}
 
-            # ✅ Fetch outfit history for personalization
+            # ✅ Stored taste vector replaces the full history scan (empty or pre-counter ones count as none)
+            taste_vector = user.get("taste_vector")
+            if not _has_taste_vector(taste_vector):
+                taste_vector = None
+
+            # ✅ Fetch outfit history for personalization (no taste vector yet)
             outfit_history = []
-            try:
+            if not taste_vector:
                 try:
-                    history_cursor = db.outfit_history.find({"user_id": ObjectId(user_id)})
-                    outfit_history = await history_cursor.to_list(length=None)
-                except:
-                    history_cursor = db.outfit_history.find({"user_id": user_id})
+                    history_cursor = db.outfit_history.find(
+                        {"user_id": _user_id_match(user_id)}, projection=HISTORY_PROJECTION
+                    ).batch_size(CURSOR_BATCH_SIZE)
                     outfit_history = await history_cursor.to_list(length=None)
                 
-                logger.info(f"📚 Found {len(outfit_history)} outfit history entries")
-            except Exception as history_error:
-                logger.warning(f"⚠️ Could not fetch outfit history (non-critical): {history_error}")
-                # Continue without history - will use default scoring
+                    logger.info(f"📚 Found {len(outfit_history)} outfit history entries")
+                except Exception as history_error:
+                    logger.warning(f"⚠️ Could not fetch outfit history (non-critical): {history_error}")
+                    # Continue without history - will use default scoring
 
             # ✅ Get weather (async-safe)
             weather_data = None
             if location:
                 try:
                     logger.info(f"🌤️ Fetching weather for {location}")
-                    result = weather_service.get_current_weather(location)
-                    if hasattr(result, "__await__"):
-                        weather_data = await result
-                    else:
-                        weather_data = result
+                    weather_data = await weather_service.aget_current_weather(location)
                     logger.info(f"✅ Weather data: {weather_data.get('temperature') if weather_data else 'None'}°C")
                 except Exception as weather_error:
                     logger.warning(f"⚠️ Weather fetch failed (non-critical): {weather_error}")
@@ -124,10 +352,14 @@ class PersonalizedAIService:
             logger.info(f"👔 User style preferences: {style_preferences}")
 
             # ✅ Analyze user history for personalization
-            user_preferences = await self._analyze_user_history(
-                outfit_history=outfit_history,
-                wardrobe_items=wardrobe_items
-            )
+            if taste_vector:
+                user_preferences = self._preferences_from_taste_vector(taste_vector)
+                logger.info(f"📈 Using stored taste vector ({taste_vector.get('events', 0)} events)")
+            else:
+                user_preferences = await self._analyze_user_history(
+                    outfit_history=outfit_history,
+                    wardrobe_items=wardrobe_items
+                )
             logger.info(f"📊 User preferences analyzed: {len(user_preferences.get('favorite_colors', []))} favorite colors, "
                        f"{len(user_preferences.get('preferred_combinations', []))} preferred combinations")
 
@@ -153,7 +385,7 @@ class PersonalizedAIService:
                 "weather": weather_data,
                 "user_style": style_preferences,
                 "personalization_data": {
-                    "history_entries": len(outfit_history),
+                    "history_entries": taste_vector.get("events", 0) if taste_vector else len(outfit_history),
                     "favorite_colors": user_preferences.get("favorite_colors", [])[:5],
                     "most_worn_categories": user_preferences.get("most_worn_categories", {})
                 }
@@ -215,20 +447,20 @@ class PersonalizedAIService:
                 # Calculate outfit score (favorite = 5, rating, or default 3)
                 outfit_score = 5.0 if is_favorite else (float(rating) if rating else 3.0)
                 
-                # Track occasions
-                occasion_count[occasion] += 1
+                # Track occasions (explicit null/empty ones are skipped)
+                if occasion:
+                    occasion_count[occasion] += 1
                 
                 # Extract colors and categories from outfit items
-                outfit_colors = []
-                outfit_categories = []
+                categories_seen = set()
+                category_count = 0
                 
                 for item in items:
-                    color = str(item.get("color", "")).lower().strip()
-                    category = str(item.get("category", "")).lower().strip()
-                    item_id = str(item.get("id", ""))
+                    color = _normalized_value(item.get("color"))
+                    category = _normalized_value(item.get("category"))
+                    item_id = "" if item.get("id") is None else str(item["id"])
                     
                     if color and color not in ["", "none", "unknown"]:
-                        outfit_colors.append(color)
                         color_scores[color] += outfit_score
                         
                         # Track color ratings
@@ -236,15 +468,16 @@ class PersonalizedAIService:
                             preferences["color_ratings"][color].append(rating)
                     
                     if category:
-                        outfit_categories.append(category)
+                        categories_seen.add(category)
+                        category_count += 1
                         preferences["category_wear_frequency"][category] += 1
                     
                     if item_id:
                         item_wear_count[item_id] += 1
                 
                 # Track category combinations (e.g., "tops+bottoms", "dress+shoes")
-                if len(outfit_categories) >= 2:
-                    combo = "+".join(sorted(set(outfit_categories)))
+                if category_count >= 2:
+                    combo = "+".join(sorted(categories_seen))
                     category_combinations[combo] += 1
             
             # Sort and extract top preferences
@@ -282,16 +515,267 @@ class PersonalizedAIService:
                 if ratings:
                     preferences["average_ratings"][color] = sum(ratings) / len(ratings)
             
-            logger.info(f"✅ Analyzed {len(outfit_history)} outfits - "
-                       f"Found {len(preferences['favorite_colors'])} favorite colors, "
-                       f"{len(preferences['preferred_combinations'])} combo patterns")
+            logger.info(
+                "✅ Analyzed %d outfits - Found %d favorite colors, %d combo patterns",
+                len(outfit_history),
+                len(preferences["favorite_colors"]),
+                len(preferences["preferred_combinations"])
+            )
             
         except Exception as e:
-            logger.error(f"❌ Error analyzing user history: {e}", exc_info=True)
+            logger.error("❌ Error analyzing user history: %s", e, exc_info=True)
             # Return empty preferences on error
         
         return preferences
 
+    async def update_taste_vector(
+        self,
+        user_id: str,
+        outfit_items: List[Dict[str, Any]],
+        rating: Optional[float] = None,
+        is_favorite: bool = False,
+        history_id: Optional[ObjectId] = None,
+        occasion: Optional[str] = None,
+        is_new: bool = True,
+        previous_rating: Optional[float] = None
+    ) -> None:
+        """
+        Fold one outfit event into the user's stored taste vector
+
+        Scores move towards the event signal with an EMA
+        (score <- (1 - 0.15) * score + 0.15 * signal) for the outfit's
+        colors and categories; everything else decays by 5%. New outfits
+        (is_new) also bump the wear counters; re-rated ones only swap
+        previous_rating for rating in the color ratings. Users without a
+        usable taste vector are first seeded from their outfit history,
+        skipping the event's own row (history_id).
+
+        The write is guarded on the events count read, so concurrent updates
+        retry instead of overwriting each other.
+        Non-critical: errors are logged, never raised.
+        """
+        try:
+            db = Database.get_database()
+            user_oid = ObjectId(user_id)
+
+            for _ in range(TASTE_UPDATE_RETRIES):
+                user = await db.users.find_one({"_id": user_oid}, projection={"taste_vector": 1})
+                if not user:
+                    logger.warning(f"⚠️ Taste vector update skipped - user {user_id} not found")
+                    return
+
+                taste_vector = user.get("taste_vector")
+                # Version guard for the write below, read before taste_vector is changed in place
+                version = taste_vector.get("events") if taste_vector else None
+                seeded = not _has_taste_vector(taste_vector)
+                if seeded:
+                    query = {"user_id": _user_id_match(user_id)}
+                    if history_id is not None:
+                        # Applied explicitly below, so don't replay it twice
+                        query["_id"] = {"$ne": history_id}
+                    history_cursor = db.outfit_history.find(
+                        query, projection=HISTORY_PROJECTION
+                    ).sort("created_at", 1).batch_size(CURSOR_BATCH_SIZE)
+                    outfit_history = await history_cursor.to_list(length=None)
+                    taste_vector = self._build_taste_vector(outfit_history)
+
+                self._apply_taste_event(taste_vector, outfit_items, self._outfit_signal(rating, is_favorite))
+                # A seed skipped this row, so it counts as a new wear either way
+                self._count_taste_event(
+                    taste_vector, outfit_items, occasion, rating,
+                    previous_rating=None if seeded else previous_rating,
+                    is_new=is_new or seeded
+                )
+                taste_vector["updated_at"] = datetime.utcnow()
+
+                result = await db.users.update_one(
+                    {"_id": user_oid, "taste_vector.events": version if version else {"$in": [None, 0]}},
+                    {"$set": {"taste_vector": taste_vector}}
+                )
+                if result.matched_count:
+                    logger.info(f"📈 Taste vector updated for user {user_id} ({taste_vector['events']} events)")
+                    return
+
+            logger.warning(f"⚠️ Taste vector update for user {user_id} dropped after {TASTE_UPDATE_RETRIES} conflicting writes")
+
+        except Exception as e:
+            logger.error(f"❌ Error updating taste vector: {e}", exc_info=True)
+
+    async def reset_taste_vector(self, user_id: str) -> None:
+        """
+        Drop the stored taste vector (e.g. after a history entry is deleted)
+
+        Counters can't un-count an outfit, so the vector is reseeded from
+        history on the next update. Non-critical: errors are logged, never raised.
+        """
+        try:
+            db = Database.get_database()
+            await db.users.update_one({"_id": ObjectId(user_id)}, {"$unset": {"taste_vector": ""}})
+        except Exception as e:
+            logger.error(f"❌ Error resetting taste vector: {e}", exc_info=True)
+
+    def _outfit_signal(self, rating: Optional[float], is_favorite: bool) -> float:
+        """Normalize an outfit's feedback to 0-1 (favorite = 1, rating / 5, or neutral 0.6)"""
+        if is_favorite:
+            return 1.0
+        if rating:
+            return float(rating) / 5.0
+        return 0.6
+
+    def _apply_taste_event(
+        self,
+        taste_vector: Dict[str, Any],
+        outfit_items: List[Dict[str, Any]],
+        signal: float
+    ) -> None:
+        """EMA-update a taste vector in place with one outfit event"""
+        for field, key_name in (("colors", "color"), ("categories", "category")):
+            scores = taste_vector.setdefault(field, {})
+            seen = set()
+            for item in outfit_items:
+                key = _field_key(_normalized_value(item.get(key_name)))
+                if key and key not in ("none", "unknown"):
+                    seen.add(key)
+
+            for key in list(scores):
+                if key not in seen:
+                    scores[key] *= (1 - TASTE_DECAY)
+                    if scores[key] < TASTE_MIN_SCORE:
+                        del scores[key]
+
+            for key in seen:
+                scores[key] = (1 - TASTE_LEARNING_RATE) * scores.get(key, 0.0) + TASTE_LEARNING_RATE * signal
+
+        taste_vector["events"] = taste_vector.get("events", 0) + 1
+
+    def _count_taste_event(
+        self,
+        taste_vector: Dict[str, Any],
+        outfit_items: List[Dict[str, Any]],
+        occasion: Optional[str],
+        rating: Optional[float],
+        previous_rating: Optional[float] = None,
+        is_new: bool = True
+    ) -> None:
+        """Update a taste vector's wear counters in place, counting like _analyze_user_history"""
+        combinations = taste_vector.setdefault("combinations", {})
+        items = taste_vector.setdefault("items", {})
+        occasions = taste_vector.setdefault("occasions", {})
+        category_counts = taste_vector.setdefault("category_counts", {})
+        color_ratings = taste_vector.setdefault("color_ratings", {})
+
+        categories_seen = set()
+        category_count = 0
+        for item in outfit_items:
+            color = _field_key(_normalized_value(item.get("color")))
+            category = _field_key(_normalized_value(item.get("category")))
+            item_id = _field_key(item.get("id"))
+
+            # color_ratings holds [sum, count] per color
+            if color and color not in ("none", "unknown"):
+                totals = color_ratings.setdefault(color, [0.0, 0])
+                if previous_rating:
+                    totals[0] -= previous_rating
+                    totals[1] -= 1
+                if rating:
+                    totals[0] += rating
+                    totals[1] += 1
+                if totals[1] <= 0:
+                    del color_ratings[color]
+
+            if not is_new:
+                continue
+            if category:
+                categories_seen.add(category)
+                category_count += 1
+                category_counts[category] = category_counts.get(category, 0) + 1
+            if item_id:
+                items[item_id] = items.get(item_id, 0) + 1
+
+        if is_new:
+            occasion_key = _field_key(occasion)
+            if occasion_key:
+                occasions[occasion_key] = occasions.get(occasion_key, 0) + 1
+            if category_count >= 2:
+                combo = "+".join(sorted(categories_seen))
+                combinations[combo] = combinations.get(combo, 0) + 1
+
+    def _build_taste_vector(self, outfit_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Rebuild a taste vector by replaying outfit history (oldest first)"""
+        taste_vector = {"colors": {}, "categories": {}, "events": 0}
+        for outfit in outfit_history:
+            if not outfit.get("outfit_items"):
+                continue
+            self._apply_taste_event(
+                taste_vector,
+                outfit["outfit_items"],
+                self._outfit_signal(outfit.get("rating"), outfit.get("is_favorite", False))
+            )
+            self._count_taste_event(
+                taste_vector, outfit["outfit_items"], outfit.get("occasion", "casual"), outfit.get("rating")
+            )
+        return taste_vector
+
+    def _preferences_from_taste_vector(self, taste_vector: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Shape a stored taste vector like the output of _analyze_user_history
+
+        Reads only the vector: recency-weighted colors, plus the wear
+        counters kept alongside them.
+        """
+        occasions = taste_vector.get("occasions", {})
+        total_occasions = sum(occasions.values())
+
+        return {
+            "favorite_colors": [color for color, _ in _top(taste_vector.get("colors", {}), 10)],
+            "preferred_combinations": [combo for combo, _ in _top(taste_vector.get("combinations", {}), 5)],
+            "most_worn_items": dict(_top(taste_vector.get("items", {}), 10)),
+            "occasion_preferences": {
+                occ: count / total_occasions for occ, count in occasions.items()
+            } if total_occasions > 0 else {},
+            "most_worn_categories": dict(_top(taste_vector.get("category_counts", {}), 5)),
+            "average_ratings": {
+                color: total / count
+                for color, (total, count) in taste_vector.get("color_ratings", {}).items()
+                if count > 0
+            }
+        }
+
+    async def _aggregate_user_preferences(self, db, user_key: Any) -> Dict[str, Any]:
+        """
+        Server-side equivalent of _analyze_user_history
+
+        Runs one $facet aggregation over outfit_history so only the top
+        colors, combinations, items, categories and occasion counts cross
+        the wire. Returns the same preference keys.
+        """
+        facets = (await db.outfit_history.aggregate(
+            _preferences_pipeline(user_key)
+        ).to_list(1) or [{}])[0]
+
+        preferences = {
+            "favorite_colors": [doc["_id"] for doc in facets.get("colors", [])],
+            "preferred_combinations": [doc["_id"] for doc in facets.get("combinations", [])],
+            "most_worn_items": {doc["_id"]: doc["n"] for doc in facets.get("items", [])},
+            "occasion_preferences": {},
+            "most_worn_categories": {doc["_id"]: doc["n"] for doc in facets.get("categories", [])},
+            "average_ratings": {
+                doc["_id"]: doc["avg_rating"]
+                for doc in facets.get("color_ratings", [])
+                if doc.get("avg_rating") is not None
+            }
+        }
+
+        occasions = facets.get("occasions", [])
+        total_occasions = sum(doc["n"] for doc in occasions)
+        if total_occasions > 0:
+            preferences["occasion_preferences"] = {
+                doc["_id"]: doc["n"] / total_occasions
+                for doc in occasions
+            }
+
+        return preferences
+
     async def _generate_recommendations(
         self,
         wardrobe_items: List[Dict[str, Any]],
@@ -322,7 +806,8 @@ class PersonalizedAIService:
             outfits = self._create_outfit_combinations(
                 categorized,
                 weather_data,
-                occasion
+                occasion,
+                user_preferences
             )
 
             # NEW: Apply history-based personalized scoring
@@ -334,25 +819,24 @@ class PersonalizedAIService:
                         user_preferences,
                         occasion
                     )
-                    outfit["personalized_score"] = personalized_score
-                    outfit["history_based"] = True
+                    outfit.personalized_score = personalized_score
+                    outfit.history_based = True
                     
                     # Combine base style score with personalized score
-                    base_score = outfit.get("style_score", 50.0)
                     # Weight: 40% base score, 60% personalized score
-                    outfit["combined_score"] = (base_score * 0.4) + (personalized_score * 0.6)
-                    outfit["style_score"] = outfit["combined_score"]  # Update main score
+                    outfit.combined_score = (outfit.style_score * 0.4) + (personalized_score * 0.6)
+                    outfit.style_score = outfit.combined_score  # Update main score
                 
                 # Re-sort by personalized combined score
-                outfits.sort(key=lambda x: x.get("combined_score", x.get("style_score", 0)), reverse=True)
+                outfits.sort(key=lambda x: x.combined_score, reverse=True)
             else:
                 logger.info("📊 Using default scoring (no history available)")
                 for outfit in outfits:
-                    outfit["history_based"] = False
+                    outfit.history_based = False
 
             # Add reasoning for top outfits
             for outfit in outfits[:10]:  # Add reasoning to top 10
-                outfit["reasoning"] = self._generate_reasoning(
+                outfit.reasoning = self._generate_reasoning(
                     outfit,
                     weather_data,
                     occasion,
@@ -360,7 +844,7 @@ class PersonalizedAIService:
                 )
 
             return {
-                "outfits": outfits[:5],  # Return top 5
+                "outfits": [outfit.to_dict() for outfit in outfits[:5]],  # Return top 5
                 "total_combinations": len(outfits),
                 "occasion": occasion,
                 "weather_considered": weather_data is not None,
@@ -373,7 +857,7 @@ class PersonalizedAIService:
 
     def _calculate_personalized_score(
         self,
-        outfit: Dict[str, Any],
+        outfit: Outfit,
         user_preferences: Dict[str, Any],
         occasion: str
     ) -> float:
@@ -390,7 +874,7 @@ class PersonalizedAIService:
         Returns score 0-100
         """
         score = 50.0  # Base score
-        items = outfit.get("items", [])
+        items = outfit.items
         
         if not items or not user_preferences:
             return score
@@ -409,21 +893,14 @@ class PersonalizedAIService:
                 if outfit_colors:
                     color_match_ratio = matching_colors / len(outfit_colors)
                     score += color_match_ratio * 30  # Up to +30 points
-                    logger.debug(f"🎨 Color match: {matching_colors}/{len(outfit_colors)} (+{color_match_ratio * 30:.1f})")
+                    logger.debug("🎨 Color match: %d/%d (+%.1f)", matching_colors, len(outfit_colors), color_match_ratio * 30)
             
             # 2. Category combination matching
             preferred_combos = user_preferences.get("preferred_combinations", [])
-            if preferred_combos:
-                outfit_categories = [
-                    str(item.get("category", "")).lower() 
-                    for item in items 
-                    if item.get("category")
-                ]
-                if len(outfit_categories) >= 2:
-                    outfit_combo = "+".join(sorted(set(outfit_categories)))
-                    if outfit_combo in preferred_combos:
-                        score += 20  # +20 points for familiar combination
-                        logger.debug(f"🔗 Combo match: {outfit_combo} (+20)")
+            if preferred_combos and outfit.combo_key is not None:
+                if outfit.combo_key in preferred_combos:
+                    score += 20  # +20 points for familiar combination
+                    logger.debug("🔗 Combo match: %s (+20)", outfit.combo_key)
             
             # 3. Item wear frequency (prefer frequently worn items)
             most_worn = user_preferences.get("most_worn_items", {})
@@ -435,7 +912,7 @@ class PersonalizedAIService:
                 if items:
                     wear_ratio = worn_items_in_outfit / len(items)
                     score += wear_ratio * 20  # Up to +20 points
-                    logger.debug(f"👕 Wear frequency: {worn_items_in_outfit}/{len(items)} (+{wear_ratio * 20:.1f})")
+                    logger.debug("👕 Wear frequency: %d/%d (+%.1f)", worn_items_in_outfit, len(items), wear_ratio * 20)
             
             # 4. Occasion preference
             occasion_prefs = user_preferences.get("occasion_preferences", {})
@@ -443,7 +920,7 @@ class PersonalizedAIService:
                 # Higher score if this occasion is frequently worn
                 occasion_weight = occasion_prefs[occasion.lower()]
                 score += occasion_weight * 15  # Up to +15 points
-                logger.debug(f"🎯 Occasion match: {occasion} ({occasion_weight:.2f}) (+{occasion_weight * 15:.1f})")
+                logger.debug("🎯 Occasion match: %s (%.2f) (+%.1f)", occasion, occasion_weight, occasion_weight * 15)
             
             # 5. Color rating history
             avg_ratings = user_preferences.get("average_ratings", {})
@@ -463,7 +940,7 @@ class PersonalizedAIService:
                     # Convert 1-5 rating to 0-15 score
                     rating_score = ((avg_color_rating - 1) / 4) * 15
                     score += rating_score
-                    logger.debug(f"⭐ Color rating: {avg_color_rating:.1f}/5 (+{rating_score:.1f})")
+                    logger.debug("⭐ Color rating: %.1f/5 (+%.1f)", avg_color_rating, rating_score)
             
         except Exception as e:
             logger.error(f"❌ Error calculating personalized score: {e}")
@@ -526,65 +1003,176 @@ class PersonalizedAIService:
         logger.info(f"📦 Categorized items: {[(k, len(v)) for k, v in categories.items()]}")
         return categories
 
+    def _prefilter_items(
+        self,
+        items: List[Dict[str, Any]],
+        user_preferences: Optional[Dict[str, Any]],
+        k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Pick the top-k items of a category before building combinations
+
+        Items are pre-ranked by a cheap preference score (favorite color
+        match, then wear count) so favorite pieces survive the cut.
+        Ties keep wardrobe order.
+        """
+        if len(items) <= k:
+            return items
+
+        user_preferences = user_preferences or {}
+        favorite_colors = set(user_preferences.get("favorite_colors", []))
+        most_worn = user_preferences.get("most_worn_items", {})
+
+        return heapq.nlargest(
+            k,
+            items,
+            key=lambda item: (
+                1 if str(item.get("color", "")).lower() in favorite_colors else 0,
+                most_worn.get(str(item.get("_id", "")), 0)
+            )
+        )
+
     def _create_outfit_combinations(
         self,
         categorized: Dict[str, List[Dict[str, Any]]],
         weather_data: Optional[Dict[str, Any]],
-        occasion: str
-    ) -> List[Dict[str, Any]]:
-        """Create outfit combinations"""
+        occasion: str,
+        user_preferences: Optional[Dict[str, Any]] = None
+    ) -> List[Outfit]:
+        """Create outfit combinations from pre-ranked candidates"""
         outfits = []
 
-        tops = categorized.get("tops", [])
-        bottoms = categorized.get("bottoms", [])
-        shoes = categorized.get("shoes", [])
-        dresses = categorized.get("dresses", [])
+        tops = self._prefilter_items(categorized.get("tops", []), user_preferences, TOP_CANDIDATES)
+        bottoms = self._prefilter_items(categorized.get("bottoms", []), user_preferences, BOTTOM_CANDIDATES)
+        shoes = self._prefilter_items(categorized.get("shoes", []), user_preferences, SHOE_CANDIDATES)
+        dresses = self._prefilter_items(categorized.get("dresses", []), user_preferences, DRESS_CANDIDATES)
         
+        # Score every combination in one vectorized pass over a shared item pool
+        pool = tops + bottoms + shoes + dresses
+        top_idx = range(0, len(tops))
+        bottom_idx = range(top_idx.stop, top_idx.stop + len(bottoms))
+        shoe_idx = range(bottom_idx.stop, bottom_idx.stop + len(shoes))
+        dress_idx = range(shoe_idx.stop, shoe_idx.stop + len(dresses))
+        color_ids, weather_hits, occasion_hits = self._item_style_features(pool, weather_data, occasion)
+
         # Strategy 1: Top + Bottom + Shoes
         if tops and bottoms and shoes:
-            for top in tops[:5]:
-                for bottom in bottoms[:5]:
-                    for shoe in shoes[:3]:
-                        outfit = {
-                            "items": [top, bottom, shoe],
-                            "type": "separates",
-                            "style_score": self._calculate_style_score(
-                                [top, bottom, shoe],
-                                weather_data,
-                                occasion
-                            )
-                        }
-                        outfits.append(outfit)
+            index = np.array(list(islice(
+                product(top_idx, bottom_idx, shoe_idx),
+                MAX_OUTFIT_CANDIDATES
+            )), dtype=np.intp)
+            scores = self._calculate_style_score_batch(
+                color_ids[index], weather_hits[index], occasion_hits[index]
+            )
+            for row, score in zip(index, scores):
+                outfits.append(Outfit(
+                    items=[pool[i] for i in row],
+                    type="separates",
+                    style_score=float(score)
+                ))
 
         # Strategy 2: Dress + Shoes
         if dresses and shoes:
-            for dress in dresses[:5]:
-                for shoe in shoes[:3]:
-                    outfit = {
-                        "items": [dress, shoe],
-                        "type": "dress_outfit",
-                        "style_score": self._calculate_style_score(
-                            [dress, shoe],
-                            weather_data,
-                            occasion
-                        )
-                    }
-                    outfits.append(outfit)
+            index = np.array(list(islice(
+                product(dress_idx, shoe_idx),
+                MAX_OUTFIT_CANDIDATES
+            )), dtype=np.intp)
+            scores = self._calculate_style_score_batch(
+                color_ids[index], weather_hits[index], occasion_hits[index]
+            )
+            for row, score in zip(index, scores):
+                outfits.append(Outfit(
+                    items=[pool[i] for i in row],
+                    type="dress_outfit",
+                    style_score=float(score)
+                ))
 
         if not outfits:
             logger.warning(f"⚠️ No outfit combinations created. Categories: {[(k, len(v)) for k, v in categorized.items()]}")
 
         # Sort by style score
-        outfits.sort(key=lambda x: x["style_score"], reverse=True)
+        outfits.sort(key=lambda x: x.style_score, reverse=True)
         return outfits
 
+    def _item_style_features(
+        self,
+        items: List[Dict[str, Any]],
+        weather_data: Optional[Dict[str, Any]],
+        occasion: str
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute per-item style features once for batch scoring
+
+        Returns (color_ids, weather_hits, occasion_hits), one entry per item.
+        Color ids are -1 for items without a color.
+        """
+        color_index: Dict[str, int] = {}
+        color_ids = np.full(len(items), -1, dtype=np.int64)
+        weather_hits = np.zeros(len(items), dtype=bool)
+        occasion_hits = np.zeros(len(items), dtype=np.int64)
+
+        suitable_materials = None
+        if weather_data:
+            temp = weather_data.get("temperature", 20)
+            try:
+                temp = float(temp)
+            except:
+                temp = 20.0
+            if temp < 10:
+                suitable_materials = WARM_MATERIALS
+            elif temp > 25:
+                suitable_materials = LIGHT_MATERIALS
+
+        occasion_pattern = OCCASION_PATTERNS.get(occasion.lower())
+
+        for i, item in enumerate(items):
+            if item.get("color"):
+                color = str(item.get("color", "")).lower()
+                color_ids[i] = color_index.setdefault(color, len(color_index))
+            if suitable_materials and item.get("material"):
+                weather_hits[i] = str(item.get("material", "")).lower() in suitable_materials
+            if occasion_pattern:
+                occasion_hits[i] = occasion_pattern.search(str(item.get("item_name", "")).lower()) is not None
+
+        return color_ids, weather_hits, occasion_hits
+
+    def _calculate_style_score_batch(
+        self,
+        outfit_colors: np.ndarray,
+        outfit_weather_hits: np.ndarray,
+        outfit_occasion_hits: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized _calculate_style_score over (N_outfits, N_items) feature arrays
+
+        Inputs are per-item features from _item_style_features gathered
+        by outfit. Returns a float64 score per outfit.
+        """
+        scores = np.full(len(outfit_colors), 50.0)
+
+        # Color coordination: at most 2 distinct (known) colors
+        colors = np.sort(outfit_colors, axis=1)
+        known = colors >= 0
+        distinct = known[:, 0].astype(np.int64) + (
+            (colors[:, 1:] != colors[:, :-1]) & known[:, 1:]
+        ).sum(axis=1)
+        scores += np.where(known.any(axis=1) & (distinct <= 2), 20.0, 0.0)
+
+        # Weather appropriateness
+        scores += np.where(outfit_weather_hits.any(axis=1), 15.0, 0.0)
+
+        # Occasion match (per matching item)
+        scores += outfit_occasion_hits.sum(axis=1) * 10.0
+
+        return np.minimum(scores, 100.0)
+
     def _calculate_style_score(
         self,
         items: List[Dict[str, Any]],
         weather_data: Optional[Dict[str, Any]],
         occasion: str
     ) -> float:
-        """Calculate base style score (before personalization)"""
+        """Calculate base style score (before personalization) for a single outfit"""
         score = 50.0
 
         # Color coordination
@@ -603,30 +1191,25 @@ class PersonalizedAIService:
             materials = [str(item.get("material", "")).lower() for item in items if item.get("material")]
 
             if temp < 10:
-                if any(m in ["wool", "fleece", "down", "thermal", "knit"] for m in materials):
+                if not WARM_MATERIALS.isdisjoint(materials):
                     score += 15
             elif temp > 25:
-                if any(m in ["cotton", "linen", "breathable", "light"] for m in materials):
+                if not LIGHT_MATERIALS.isdisjoint(materials):
                     score += 15
 
         # Occasion match
-        occasion_keywords = {
-            "formal": ["suit", "dress", "blazer", "tie", "heels"],
-            "casual": ["jeans", "t-shirt", "sneakers", "shorts"],
-            "business": ["trousers", "shirt", "blazer", "slacks"]
-        }
-
-        if occasion.lower() in occasion_keywords:
-            for item in items:
-                name = str(item.get("item_name", "")).lower()
-                if any(kw in name for kw in occasion_keywords[occasion.lower()]):
-                    score += 10
+        occasion_pattern = OCCASION_PATTERNS.get(occasion.lower())
+        if occasion_pattern:
+            score += 10 * sum(
+                1 for item in items
+                if occasion_pattern.search(str(item.get("item_name", "")).lower())
+            )
 
         return min(score, 100.0)
 
     def _generate_reasoning(
         self,
-        outfit: Dict[str, Any],
+        outfit: Outfit,
         weather_data: Optional[Dict[str, Any]],
         occasion: str,
         user_preferences: Optional[Dict[str, Any]] = None  # NEW PARAMETER
@@ -636,9 +1219,9 @@ class PersonalizedAIService:
         
         MODIFIED: Now includes personalization reasoning
         """
-        items = outfit.get("items", [])
-        score = outfit.get("style_score", 50)
-        personalized_score = outfit.get("personalized_score")
+        items = outfit.items
+        score = outfit.style_score
+        personalized_score = outfit.personalized_score
         
         reasoning_parts = []
 
@@ -714,41 +1297,31 @@ class PersonalizedAIService:
             if user_id:
                 try:
                     db = Database.get_database()
-                    try:
-                        history_cursor = db.outfit_history.find({"user_id": ObjectId(user_id)})
-                        outfit_history = await history_cursor.to_list(length=None)
-                    except:
-                        history_cursor = db.outfit_history.find({"user_id": user_id})
-                        outfit_history = await history_cursor.to_list(length=None)
-                    
-                    user_preferences = await self._analyze_user_history(
-                        outfit_history=outfit_history,
-                        wardrobe_items=[]
-                    )
+                    user_preferences = await self._aggregate_user_preferences(db, _user_id_match(user_id))
                 except Exception as e:
                     logger.warning(f"Could not fetch user history for analysis: {e}")
             
             # Calculate scores
             base_score = self._calculate_style_score(outfit_items, weather_data, occasion)
             
-            outfit_dict = {"items": outfit_items, "type": "custom", "style_score": base_score}
+            outfit = Outfit(items=outfit_items, type="custom", style_score=base_score)
             
             # Add personalized score if available
             if user_preferences:
                 personalized_score = self._calculate_personalized_score(
-                    outfit_dict,
+                    outfit,
                     user_preferences,
                     occasion
                 )
                 combined_score = (base_score * 0.4) + (personalized_score * 0.6)
-                outfit_dict["personalized_score"] = personalized_score
-                outfit_dict["combined_score"] = combined_score
+                outfit.personalized_score = personalized_score
+                outfit.combined_score = combined_score
                 final_score = combined_score
             else:
                 final_score = base_score
             
             reasoning = self._generate_reasoning(
-                outfit_dict,
+                outfit,
                 weather_data,
                 occasion,
                 user_preferences
@@ -757,10 +1330,10 @@ class PersonalizedAIService:
             return {
                 "score": round(final_score, 1),
                 "base_score": round(base_score, 1),
-                "personalized_score": round(outfit_dict.get("personalized_score", 0), 1) if user_preferences else None,
+                "personalized_score": round(outfit.personalized_score or 0, 1) if user_preferences else None,
                 "rating": "excellent" if final_score >= 80 else "good" if final_score >= 60 else "fair",
                 "reasoning": reasoning,
-                "suggestions": self._generate_improvement_suggestions(outfit_items, final_score, user_preferences),
+                "suggestions": self._generate_improvement_suggestions(outfit, final_score, user_preferences),
                 "personalization_used": user_preferences is not None
             }
         except Exception as e:
@@ -769,7 +1342,7 @@ class PersonalizedAIService:
 
     def _generate_improvement_suggestions(
         self,
-        items: List[Dict[str, Any]],
+        outfit: Outfit,
         score: float,
         user_preferences: Optional[Dict[str, Any]] = None  # NEW
     ) -> List[str]:
@@ -779,6 +1352,7 @@ class PersonalizedAIService:
         MODIFIED: Uses user preferences for personalized suggestions
         """
         suggestions = []
+        items = outfit.items
 
         # General suggestions
         if score < 60:
@@ -788,31 +1362,22 @@ class PersonalizedAIService:
         if len(items) > 4:
             suggestions.append("Less is more - try removing one piece")
 
-        colors = [str(item.get("color", "")).lower() for item in items if item.get("color")]
-        if colors and len(set(colors)) > 3:
+        outfit_colors = {str(item.get("color", "")).lower() for item in items if item.get("color")}
+        if len(outfit_colors) > 3:
             suggestions.append("Try limiting to 2-3 complementary colors")
 
         # NEW: Personalized suggestions based on history
         if user_preferences:
             favorite_colors = user_preferences.get("favorite_colors", [])
-            outfit_colors = [c for c in colors if c]
             
             # Suggest favorite colors if none used
-            if favorite_colors and not any(c in favorite_colors for c in outfit_colors):
-                suggestions.append(f"Try incorporating your favorite colors: {', '.join(favorite_colors[:3])}")
+            if favorite_colors and outfit_colors.isdisjoint(favorite_colors):
+                suggestions.append(_favorite_colors_hint(tuple(favorite_colors[:3])))
             
             # Suggest preferred combinations
             preferred_combos = user_preferences.get("preferred_combinations", [])
             if preferred_combos:
-                outfit_categories = [
-                    str(item.get("category", "")).lower() 
-                    for item in items 
-                    if item.get("category")
-                ]
-                outfit_combo = "+".join(sorted(set(outfit_categories)))
-                
-                if outfit_combo not in preferred_combos and preferred_combos:
-                    top_combo = preferred_combos[0].replace("+", " with ")
-                    suggestions.append(f"You usually prefer {top_combo} combinations")
+                if outfit.combo_key not in preferred_combos:
+                    suggestions.append(_preferred_combo_hint(preferred_combos[0]))
 
         return suggestions
\ No newline at end of file
@@ -1,27 +1,247 @@
 # app/services/push_notification_service.py
-import requests
+import aiohttp
 import logging
+import orjson
+import re
+import time
+from collections import deque
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import asyncio
 from bson import ObjectId  # ✅ ADD THIS IMPORT
+from cachetools import TTLCache
+from pymongo import UpdateOne
 from app.database import get_database
 
 logger = logging.getLogger(__name__)
 
+# Expo push tokens look like ExponentPushToken[xxxxxxxx]
+_is_expo_token = re.compile(r'ExponentPushToken\[').match
+
+# The only user fields the notification senders read
+NOTIFICATION_USER_PROJECTION = {
+    "email": 1,
+    "push_tokens": 1,
+    "notification_settings": 1,
+    "location": 1
+}
+
+DAILY_REMINDER_DATA = {"type": "daily_reminder", "screen": "Suggestions"}
+
+# Queued by aclose behind every pending log: the flusher writes what it holds and exits
+_LOG_FLUSHER_STOP = object()
+
+# Short-lived cache of those fields, keyed by ObjectId
+USER_CACHE_TTL_SECONDS = 60
+_user_cache: TTLCache = TTLCache(maxsize=10000, ttl=USER_CACHE_TTL_SECONDS)
+
+
+async def _fetch_user_for_notification(db, user_oid: ObjectId) -> Optional[Dict[str, Any]]:
+    """Fetch only the notification fields of a user"""
+    return await db.users.find_one({"_id": user_oid}, NOTIFICATION_USER_PROJECTION)
+
+
+async def _get_user_cached(db, user_oid: ObjectId) -> Optional[Dict[str, Any]]:
+    """Return the notification fields of a user, from cache when fresh"""
+    user = _user_cache.get(user_oid)
+    if user is None:
+        user = await _fetch_user_for_notification(db, user_oid)
+        if user is None:
+            return None
+        _user_cache[user_oid] = user
+    return user
+
+
+def normalize_push_tokens(tokens: Any) -> List[str]:
+    """
+    Coerce stored push_tokens to a de-duplicated list of valid Expo tokens
+
+    Applied when tokens are written; legacy documents are rewritten once at
+    startup (Database.run_migrations), so senders use stored tokens as-is.
+    """
+    if isinstance(tokens, str):
+        tokens = [tokens]
+    return list(dict.fromkeys(
+        token for token in tokens or []
+        if isinstance(token, str) and _is_expo_token(token)
+    ))
+
+
+def invalidate_user(user_id) -> None:
+    """Drop a cached user after push tokens, settings or location change"""
+    try:
+        _user_cache.pop(ObjectId(user_id), None)
+    except Exception:
+        pass
+
 class PushNotificationService:
     """Service for sending Expo push notifications"""
     
     EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+    EXPO_RECEIPTS_URL = "https://exp.host/--/api/v2/push/getReceipts"
     MAX_BATCH_SIZE = 100  # Expo limit
+    MAX_RECEIPT_BATCH_SIZE = 1000  # Expo limit
+    RECEIPT_POLL_INTERVAL_SECONDS = 15
+    RECEIPT_DELAY_SECONDS = 15 * 60  # Expo advises waiting before fetching receipts
+    MAX_CONCURRENT_BATCHES = 10
+    REQUEST_TIMEOUT_SECONDS = 10
+    LOG_FLUSH_BATCH_SIZE = 100
+    LOG_FLUSH_INTERVAL_SECONDS = 0.5
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Accept': 'application/json',
-            'Accept-Encoding': 'gzip, deflate',
-            'Content-Type': 'application/json',
-        })
+        # Created lazily: aiohttp sessions must be opened inside the running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        # push_logs writes are queued and flushed in batches by a background task,
+        # both created on first use inside the running loop
+        self._log_queue: Optional[asyncio.Queue] = None
+        self._log_flusher_task: Optional[asyncio.Task] = None
+        # (queued_at, db, ticket_id) awaiting a delivery receipt, oldest first
+        self._pending_receipts: deque = deque()
+        self._receipts_task: Optional[asyncio.Task] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared keep-alive session, opening it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={
+                    'Accept': 'application/json',
+                    'Accept-Encoding': 'gzip, deflate',
+                    'Content-Type': 'application/json',
+                },
+                connector=aiohttp.TCPConnector(limit=50, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT_SECONDS)
+            )
+        return self._session
+    
+    async def aclose(self):
+        """Flush pending logs and close the HTTP session (call on application shutdown)"""
+        if self._receipts_task is not None:
+            self._receipts_task.cancel()
+            try:
+                await self._receipts_task
+            except asyncio.CancelledError:
+                pass
+        self._receipts_task = None
+        
+        # Stop the flusher in queue order so its buffer and in-flight insert complete
+        if self._log_flusher_task is not None and not self._log_flusher_task.done():
+            self._log_queue.put_nowait(_LOG_FLUSHER_STOP)
+            await self._log_flusher_task
+        self._log_flusher_task = None
+        
+        if self._pending_receipts:
+            logger.info("Dropping %d unchecked push receipt(s) on shutdown", len(self._pending_receipts))
+            self._pending_receipts.clear()
+        
+        pending = []
+        while self._log_queue is not None and not self._log_queue.empty():
+            pending.append(self._log_queue.get_nowait())
+        if pending:
+            await self._write_logs(pending)
+        
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    def _queue_log(self, db, doc: Dict[str, Any]):
+        """Queue a push_logs document, starting the flusher on first use"""
+        if self._log_queue is None:
+            self._log_queue = asyncio.Queue()
+        if self._log_flusher_task is None or self._log_flusher_task.done():
+            self._log_flusher_task = asyncio.create_task(self._log_flusher())
+        self._log_queue.put_nowait((db, doc))
+    
+    async def _log_flusher(self):
+        """Write queued logs every LOG_FLUSH_BATCH_SIZE docs or LOG_FLUSH_INTERVAL_SECONDS"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            entry = await self._log_queue.get()
+            if entry is _LOG_FLUSHER_STOP:
+                return
+            buffer = [entry]
+            deadline = loop.time() + self.LOG_FLUSH_INTERVAL_SECONDS
+            
+            while len(buffer) < self.LOG_FLUSH_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._log_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is _LOG_FLUSHER_STOP:
+                    stopping = True
+                    break
+                buffer.append(entry)
+            
+            await self._write_logs(buffer)
+    
+    async def _write_logs(self, entries: List[tuple]):
+        """Insert queued (db, doc) pairs, one insert_many per database"""
+        docs_by_db: Dict[int, tuple] = {}
+        for db, doc in entries:
+            docs_by_db.setdefault(id(db), (db, []))[1].append(doc)
+        
+        for db, docs in docs_by_db.values():
+            try:
+                await db.push_logs.insert_many(docs, ordered=False)
+            except Exception as log_error:
+                logger.warning("⚠️ Failed to log %d notification(s): %s", len(docs), log_error)
+    
+    def _track_receipts(self, db, ticket_ids: List[str]):
+        """Remember accepted tickets so their receipts are checked later, off the send path"""
+        if not ticket_ids:
+            return
+        if self._receipts_task is None or self._receipts_task.done():
+            self._receipts_task = asyncio.create_task(self._receipts_worker())
+        queued_at = time.monotonic()
+        self._pending_receipts.extend((queued_at, db, ticket_id) for ticket_id in ticket_ids)
+    
+    async def _receipts_worker(self):
+        """Periodically fetch receipts for tickets that are old enough"""
+        while True:
+            await asyncio.sleep(self.RECEIPT_POLL_INTERVAL_SECONDS)
+            
+            cutoff = time.monotonic() - self.RECEIPT_DELAY_SECONDS
+            due = []
+            while self._pending_receipts and self._pending_receipts[0][0] <= cutoff:
+                due.append(self._pending_receipts.popleft())
+            
+            for i in range(0, len(due), self.MAX_RECEIPT_BATCH_SIZE):
+                await self._check_receipts(due[i:i + self.MAX_RECEIPT_BATCH_SIZE])
+    
+    async def _check_receipts(self, entries: List[tuple]):
+        """Fetch receipts for one batch of tickets and record them on their push_logs"""
+        try:
+            async with self._get_session().post(
+                self.EXPO_RECEIPTS_URL,
+                data=orjson.dumps({"ids": [ticket_id for _, _, ticket_id in entries]})
+            ) as response:
+                response.raise_for_status()
+                receipts = orjson.loads(await response.read()).get("data", {})
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            logger.error("❌ Receipt fetch error: %s", e)
+            return
+        
+        ops_by_db: Dict[int, tuple] = {}
+        for _, db, ticket_id in entries:
+            receipt = receipts.get(ticket_id)
+            if receipt is None:
+                continue
+            ops_by_db.setdefault(id(db), (db, []))[1].append(UpdateOne(
+                {"tickets.ticket_id": ticket_id},
+                {"$set": {
+                    "tickets.$.receipt_status": receipt.get("status"),
+                    "tickets.$.receipt_error": receipt.get("details", {}).get("error")
+                }}
+            ))
+        
+        for db, ops in ops_by_db.values():
+            try:
+                await db.push_logs.bulk_write(ops, ordered=False)
+            except Exception as log_error:
+                logger.warning("⚠️ Failed to record %d push receipt(s): %s", len(ops), log_error)
     
     async def send_push_notification(
         self,
@@ -32,7 +252,8 @@ class PushNotificationService:
         priority: str = "default",
         sound: str = "default",
         badge: Optional[int] = None,
-        channel_id: Optional[str] = None
+        channel_id: Optional[str] = None,
+        prevalidated: bool = False
     ) -> Dict[str, Any]:
         """
         Send push notification to one or more devices
@@ -46,6 +267,7 @@ class PushNotificationService:
             sound: default or custom sound name
             badge: Badge count (iOS)
             channel_id: Android notification channel
+            prevalidated: Tokens come from normalize_push_tokens (skip filtering)
         
         Returns:
             Dict with success status and results
@@ -55,50 +277,57 @@ class PushNotificationService:
                 logger.warning("No push tokens provided")
                 return {"success": False, "error": "No push tokens"}
             
-            # Filter valid tokens
-            valid_tokens = [
-                token for token in push_tokens 
-                if token and token.startswith('ExponentPushToken[')
-            ]
+            # Filter valid tokens (stored tokens are normalized on write)
+            if prevalidated:
+                valid_tokens = push_tokens
+            else:
+                valid_tokens = list(filter(_is_expo_token, filter(None, push_tokens)))
             
             if not valid_tokens:
                 logger.warning("No valid Expo push tokens")
                 return {"success": False, "error": "No valid tokens"}
             
-            # Prepare messages
-            messages = []
-            for token in valid_tokens:
-                message = {
-                    "to": token,
-                    "title": title,
-                    "body": body,
-                    "priority": priority,
-                    "sound": sound,
-                }
-                
-                if data:
-                    message["data"] = data
-                
-                if badge is not None:
-                    message["badge"] = badge
+            # Prepare one shared payload; Expo fans it out to every token in "to"
+            base_message = {
+                "title": title,
+                "body": body,
+                "priority": priority,
+                "sound": sound,
+            }
+            
+            if data:
+                base_message["data"] = data
+            
+            if badge is not None:
+                base_message["badge"] = badge
+            
+            if channel_id:
+                base_message["channelId"] = channel_id
+            
+            # One message per batch of up to 100 recipients
+            batches = [
+                [{**base_message, "to": valid_tokens[i:i + self.MAX_BATCH_SIZE]}]
+                for i in range(0, len(valid_tokens), self.MAX_BATCH_SIZE)
+            ]
+            
+            if len(batches) == 1:
+                # Common case (a single user's devices): no fan-out machinery needed
+                results = await self._send_batch(batches[0])
+            else:
+                semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_BATCHES)
                 
-                if channel_id:
-                    message["channelId"] = channel_id
+                async def send_guarded(batch: List[Dict]) -> List[Dict]:
+                    async with semaphore:
+                        return await self._send_batch(batch)
                 
-                messages.append(message)
-            
-            # Send in batches
-            results = []
-            for i in range(0, len(messages), self.MAX_BATCH_SIZE):
-                batch = messages[i:i + self.MAX_BATCH_SIZE]
-                batch_result = await self._send_batch(batch)
-                results.extend(batch_result)
+                batch_results = await asyncio.gather(*(send_guarded(batch) for batch in batches))
+                results = [r for batch_result in batch_results for r in batch_result]
             
             # Process results
             success_count = sum(1 for r in results if r.get('status') == 'ok')
             error_count = len(results) - success_count
             
-            logger.info(f"📤 Push notifications sent: {success_count} success, {error_count} errors")
+            logger.info("📤 Push notifications sent: %d success, %d errors", success_count, error_count)
             
             return {
                 "success": True,
@@ -109,7 +338,7 @@ class PushNotificationService:
             }
             
         except Exception as e:
-            logger.error(f"❌ Push notification error: {e}")
+            logger.error("❌ Push notification error: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -118,21 +347,73 @@ class PushNotificationService:
     async def _send_batch(self, messages: List[Dict]) -> List[Dict]:
         """Send a batch of push notifications"""
         try:
-            response = await asyncio.to_thread(
-                self.session.post,
-                self.EXPO_PUSH_URL,
-                json=messages,
-                timeout=10
-            )
-            
-            response.raise_for_status()
-            data = response.json()
+            # orjson encodes to bytes; the session already sends the JSON Content-Type
+            async with self._get_session().post(
+                self.EXPO_PUSH_URL, data=orjson.dumps(messages)
+            ) as response:
+                response.raise_for_status()
+                data = orjson.loads(await response.read())
             
             return data.get('data', [])
             
-        except requests.RequestException as e:
-            logger.error(f"❌ Batch send error: {e}")
-            return [{"status": "error", "message": str(e)} for _ in messages]
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            logger.error("❌ Batch send error: %s", e)
+            # One error ticket per recipient, matching Expo's per-token tickets
+            recipient_count = sum(
+                len(m["to"]) if isinstance(m.get("to"), list) else 1
+                for m in messages
+            )
+            return [{"status": "error", "message": str(e)} for _ in range(recipient_count)]
+    
+    def _build_log_doc(
+        self,
+        user_oid: ObjectId,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, Any]],
+        result: Dict[str, Any],
+        tickets: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Build a push_logs document for one recipient"""
+        doc = {
+            "user_id": user_oid,
+            "title": title,
+            "body": body,
+            "data": data,
+            "success": result.get("success"),
+            "sent_at": datetime.utcnow()
+        }
+        if tickets is not None:
+            doc["tickets"] = tickets
+        return doc
+    
+    def _queue_recipient_logs(
+        self,
+        db,
+        recipients: List[tuple],
+        title: str,
+        body: str,
+        data: Optional[Dict[str, Any]],
+        result: Dict[str, Any]
+    ):
+        """
+        Queue one push_logs document per recipient with its per-token tickets
+        
+        recipients are (user_oid, tokens) pairs in the order their tokens were
+        sent, which is the order Expo returns tickets in.
+        """
+        results = result.get("results", [])
+        offset = 0
+        for user_oid, tokens in recipients:
+            tickets = [
+                {"token": token, "status": ticket.get("status"), "ticket_id": ticket.get("id")}
+                for token, ticket in zip(tokens, results[offset:offset + len(tokens)])
+            ]
+            offset += len(tokens)
+            self._queue_log(db, self._build_log_doc(user_oid, title, body, data, result, tickets))
+            self._track_receipts(
+                db, [ticket["ticket_id"] for ticket in tickets if ticket["status"] == "ok" and ticket["ticket_id"]]
+            )
     
     async def send_to_user(
         self,
@@ -161,60 +442,49 @@ class PushNotificationService:
             try:
                 user_oid = ObjectId(user_id)
             except Exception as e:
-                logger.error(f"❌ Invalid user_id format: {user_id}")
+                logger.error("❌ Invalid user_id format: %s", user_id)
                 return {"success": False, "error": f"Invalid user_id: {str(e)}"}
             
-            # Get user's push tokens
-            user = await db.users.find_one({"_id": user_oid})
+            # Get user's push tokens and settings (cached, projected)
+            user = await _get_user_cached(db, user_oid)
             
             if not user:
-                logger.error(f"❌ User not found with id: {user_id}")
+                logger.error("❌ User not found with id: %s", user_id)
                 return {"success": False, "error": "User not found"}
             
-            logger.info(f"✅ Found user: {user.get('email', 'unknown')}")
+            logger.info("✅ Found user: %s", user.get('email', 'unknown'))
             
             # Check notification settings
             settings = user.get("notification_settings", {})
             if not settings.get("notifications_enabled", True):
-                logger.info(f"Notifications disabled for user {user_id}")
+                logger.info("Notifications disabled for user %s", user_id)
                 return {"success": False, "error": "Notifications disabled"}
             
             # Get push tokens
             push_tokens = user.get("push_tokens", [])
-            if isinstance(push_tokens, str):
-                push_tokens = [push_tokens]
             
             if not push_tokens:
-                logger.warning(f"⚠️ No push tokens for user {user.get('email', user_id)}")
+                logger.warning("⚠️ No push tokens for user %s", user.get('email', user_id))
                 return {"success": False, "error": "No push tokens"}
             
-            logger.info(f"📱 Found {len(push_tokens)} push token(s) for user")
+            logger.info("📱 Found %d push token(s) for user", len(push_tokens))
             
             # Send notification
             result = await self.send_push_notification(
                 push_tokens=push_tokens,
                 title=title,
                 body=body,
-                data=data
+                data=data,
+                prevalidated=True
             )
             
-            # Log notification in database
-            try:
-                await db.push_logs.insert_one({
-                    "user_id": user_oid,
-                    "title": title,
-                    "body": body,
-                    "data": data,
-                    "success": result.get("success"),
-                    "sent_at": datetime.utcnow()
-                })
-            except Exception as log_error:
-                logger.warning(f"⚠️ Failed to log notification: {log_error}")
+            # Log notification in database (batched by the background flusher)
+            self._queue_recipient_logs(db, [(user_oid, push_tokens)], title, body, data, result)
             
             return result
             
         except Exception as e:
-            logger.error(f"❌ Send to user error: {e}", exc_info=True)
+            logger.error("❌ Send to user error: %s", e, exc_info=True)
             return {"success": False, "error": str(e)}
     
     async def send_to_multiple_users(
@@ -231,23 +501,25 @@ class PushNotificationService:
                 from app.database import Database
                 db = Database.get_database()
             
-            # Collect all push tokens
+            user_oids = [ObjectId(user_id) for user_id in user_ids if ObjectId.is_valid(user_id)]
+            if len(user_oids) < len(user_ids):
+                logger.warning("⚠️ Skipping %d invalid user_id(s)", len(user_ids) - len(user_oids))
+            
+            # Collect all push tokens in one round-trip
             all_tokens = []
+            recipients = []
             
-            for user_id in user_ids:
-                try:
-                    user_oid = ObjectId(user_id)
-                    user = await db.users.find_one({"_id": user_oid})
-                    if user:
-                        settings = user.get("notification_settings", {})
-                        if settings.get("notifications_enabled", True):
-                            tokens = user.get("push_tokens", [])
-                            if isinstance(tokens, str):
-                                tokens = [tokens]
-                            all_tokens.extend(tokens)
-                except Exception as e:
-                    logger.warning(f"⚠️ Skipping invalid user_id {user_id}: {e}")
-                    continue
+            cursor = db.users.find(
+                {"_id": {"$in": user_oids}},
+                projection={"push_tokens": 1, "notification_settings": 1}
+            )
+            async for user in cursor:
+                settings = user.get("notification_settings", {})
+                if settings.get("notifications_enabled", True):
+                    tokens = user.get("push_tokens", [])
+                    if tokens:
+                        all_tokens.extend(tokens)
+                        recipients.append((user["_id"], tokens))
             
             if not all_tokens:
                 return {"success": False, "error": "No push tokens found"}
@@ -257,13 +529,17 @@ class PushNotificationService:
                 push_tokens=all_tokens,
                 title=title,
                 body=body,
-                data=data
+                data=data,
+                prevalidated=True
             )
             
+            # Log all recipients once the send has completed
+            self._queue_recipient_logs(db, recipients, title, body, data, result)
+            
             return result
             
         except Exception as e:
-            logger.error(f"❌ Send to multiple users error: {e}")
+            logger.error("❌ Send to multiple users error: %s", e)
             return {"success": False, "error": str(e)}
     
     async def send_daily_outfit_reminder(self, user_id: str, db = None):
@@ -274,7 +550,7 @@ class PushNotificationService:
                 db = Database.get_database()
             
             user_oid = ObjectId(user_id)
-            user = await db.users.find_one({"_id": user_oid})
+            user = await _get_user_cached(db, user_oid)
             if not user:
                 return
             
@@ -285,33 +561,98 @@ class PushNotificationService:
             # Get weather for user's location
             from app.services.weather_service import weather_service
             location = user.get("location", "New York")
-            weather = weather_service.get_current_weather(location)
+            weather = await weather_service.aget_current_weather(location)
             
-            if weather:
-                temp = weather.get("temperature", 72)
-                condition = weather.get("condition", "Sunny")
-                
-                title = f"☀️ Good Morning! It's {temp}°F"
-                body = f"{condition} today - Time to pick your outfit!"
-            else:
-                title = "☀️ Good Morning!"
-                body = "Time to pick your perfect outfit for the day!"
+            title, body = self._daily_reminder_text(weather)
             
             await self.send_to_user(
                 user_id=user_id,
                 title=title,
                 body=body,
-                data={
-                    "type": "daily_reminder",
-                    "screen": "Suggestions"
-                },
+                data=DAILY_REMINDER_DATA,
                 db=db
             )
             
-            logger.info(f"📤 Daily reminder sent to user {user_id}")
+            logger.info("📤 Daily reminder sent to user %s", user_id)
+            
+        except Exception as e:
+            logger.error("❌ Daily reminder error: %s", e)
+    
+    @staticmethod
+    def _daily_reminder_text(weather: Optional[Dict[str, Any]]) -> tuple:
+        """Title and body of the daily reminder for the given weather"""
+        if weather:
+            temp = weather.get("temperature", 72)
+            condition = weather.get("condition", "Sunny")
+            
+            return (
+                f"☀️ Good Morning! It's {temp}°F",
+                f"{condition} today - Time to pick your outfit!"
+            )
+        return "☀️ Good Morning!", "Time to pick your perfect outfit for the day!"
+    
+    async def send_daily_reminders_bulk(self, user_ids: List[str], db = None) -> Dict[str, Any]:
+        """
+        Send daily outfit reminders to many users at once
+        
+        Users are fetched in one query and grouped by location, so weather is
+        looked up once per unique location and each group shares one push.
+        """
+        try:
+            if db is None:
+                from app.database import Database
+                db = Database.get_database()
+            
+            user_oids = [ObjectId(user_id) for user_id in user_ids if ObjectId.is_valid(user_id)]
+            
+            # location -> (tokens, (user_oid, tokens) recipients)
+            by_location: Dict[str, tuple] = {}
+            cursor = db.users.find({"_id": {"$in": user_oids}}, NOTIFICATION_USER_PROJECTION)
+            async for user in cursor:
+                settings = user.get("notification_settings", {})
+                if not (settings.get("notifications_enabled", True)
+                        and settings.get("daily_outfit_reminder", True)):
+                    continue
+                tokens = user.get("push_tokens", [])
+                if not tokens:
+                    continue
+                group = by_location.setdefault(user.get("location", "New York"), ([], []))
+                group[0].extend(tokens)
+                group[1].append((user["_id"], tokens))
+            
+            if not by_location:
+                return {"success": False, "error": "No push tokens found"}
+            
+            # Look up each unique location once, concurrently
+            from app.services.weather_service import weather_service
+            locations = list(by_location)
+            weathers = await weather_service.aget_weather_batch(locations)
+            
+            sent = 0
+            for location, weather in zip(locations, weathers):
+                if isinstance(weather, Exception):
+                    logger.warning("⚠️ Weather lookup failed for %s: %s", location, weather)
+                    weather = None
+                
+                tokens, recipients = by_location[location]
+                title, body = self._daily_reminder_text(weather)
+                result = await self.send_push_notification(
+                    push_tokens=tokens,
+                    title=title,
+                    body=body,
+                    data=DAILY_REMINDER_DATA,
+                    prevalidated=True
+                )
+                self._queue_recipient_logs(db, recipients, title, body, DAILY_REMINDER_DATA, result)
+                sent += len(recipients)
+            
+            logger.info("📤 Daily reminders sent to %d user(s) across %d location(s)", sent, len(locations))
+            
+            return {"success": True, "users": sent, "locations": len(locations)}
             
         except Exception as e:
-            logger.error(f"❌ Daily reminder error: {e}")
+            logger.error("❌ Bulk daily reminder error: %s", e)
+            return {"success": False, "error": str(e)}
     
     async def send_weather_alert(
         self,
@@ -327,7 +668,7 @@ class PushNotificationService:
                 db = Database.get_database()
             
             user_oid = ObjectId(user_id)
-            user = await db.users.find_one({"_id": user_oid})
+            user = await _get_user_cached(db, user_oid)
             if not user:
                 return
             
@@ -347,7 +688,7 @@ class PushNotificationService:
             )
             
         except Exception as e:
-            logger.error(f"❌ Weather alert error: {e}")
+            logger.error("❌ Weather alert error: %s", e)
     
     async def send_outfit_suggestion_notification(
         self,
@@ -362,7 +703,7 @@ class PushNotificationService:
                 db = Database.get_database()
             
             user_oid = ObjectId(user_id)
-            user = await db.users.find_one({"_id": user_oid})
+            user = await _get_user_cached(db, user_oid)
             if not user:
                 return
             
@@ -382,7 +723,7 @@ class PushNotificationService:
             )
             
         except Exception as e:
-            logger.error(f"❌ Outfit suggestion notification error: {e}")
+            logger.error("❌ Outfit suggestion notification error: %s", e)
     
     async def send_achievement_notification(
         self,
@@ -398,7 +739,7 @@ class PushNotificationService:
                 db = Database.get_database()
             
             user_oid = ObjectId(user_id)
-            user = await db.users.find_one({"_id": user_oid})
+            user = await _get_user_cached(db, user_oid)
             if not user:
                 return
             
@@ -418,7 +759,7 @@ class PushNotificationService:
             )
             
         except Exception as e:
-            logger.error(f"❌ Achievement notification error: {e}")
+            logger.error("❌ Achievement notification error: %s", e)
 
 # Singleton instance
 push_notification_service = PushNotificationService()
\ No newline at end of file
@@ -1,35 +1,292 @@
 # app/services/weather_service.py - COMPLETE ENHANCED VERSION
+import asyncio
+import aiohttp
+import re
 import requests
 import logging
-from typing import Dict, Optional, List, Tuple
-from datetime import datetime, timedelta
+import orjson
+from typing import Callable, Dict, Optional, List, Tuple, TypeVar
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import TTLCache
+from functools import lru_cache
+from bisect import bisect_right
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Temperature thresholds for outfit recommendations
+TEMPERATURE_CATEGORIES = {
+    'freezing': {'min': -float('inf'), 'max': 0},
+    'cold': {'min': 0, 'max': 10},
+    'cool': {'min': 10, 'max': 20},
+    'warm': {'min': 20, 'max': 30},
+    'hot': {'min': 30, 'max': float('inf')}
+}
+# Same thresholds as sorted boundaries for bisect: TEMP_NAMES[i] covers [TEMP_BOUNDS[i-1], TEMP_BOUNDS[i])
+TEMP_BOUNDS = (0, 10, 20, 30)
+TEMP_NAMES = ('freezing', 'cold', 'cool', 'warm', 'hot')
+
+# WMO Weather interpretation codes -> (condition, description)
+# https://open-meteo.com/en/docs
+WEATHER_CODES = {
+    0: ("Clear", "Clear sky"),
+    1: ("Mainly Clear", "Mainly clear sky"),
+    2: ("Partly Cloudy", "Partly cloudy"),
+    3: ("Overcast", "Overcast"),
+    45: ("Fog", "Foggy"),
+    48: ("Fog", "Depositing rime fog"),
+    51: ("Drizzle", "Light drizzle"),
+    53: ("Drizzle", "Moderate drizzle"),
+    55: ("Drizzle", "Dense drizzle"),
+    56: ("Freezing Drizzle", "Light freezing drizzle"),
+    57: ("Freezing Drizzle", "Dense freezing drizzle"),
+    61: ("Rain", "Slight rain"),
+    63: ("Rain", "Moderate rain"),
+    65: ("Rain", "Heavy rain"),
+    66: ("Freezing Rain", "Light freezing rain"),
+    67: ("Freezing Rain", "Heavy freezing rain"),
+    71: ("Snow", "Slight snow fall"),
+    73: ("Snow", "Moderate snow fall"),
+    75: ("Snow", "Heavy snow fall"),
+    77: ("Snow", "Snow grains"),
+    80: ("Showers", "Slight rain showers"),
+    81: ("Showers", "Moderate rain showers"),
+    82: ("Showers", "Violent rain showers"),
+    85: ("Snow Showers", "Slight snow showers"),
+    86: ("Snow Showers", "Heavy snow showers"),
+    95: ("Thunderstorm", "Thunderstorm"),
+    96: ("Thunderstorm", "Thunderstorm with slight hail"),
+    99: ("Thunderstorm", "Thunderstorm with heavy hail")
+}
+UNKNOWN_WEATHER = ("Unknown", "Unknown condition")
+# WMO codes span 0-99; indexed directly instead of hashing into WEATHER_CODES
+_WMO_TABLE: Tuple[Tuple[str, str], ...] = tuple(
+    WEATHER_CODES.get(code, UNKNOWN_WEATHER) for code in range(100)
+)
+
+# Per-category get_dress_recommendation text (read-only; copy before editing)
+DRESS_BY_CATEGORY = {
+    'freezing': MappingProxyType({
+        'layers': 'Heavy layering required (3+ layers)',
+        'outerwear': 'Insulated winter coat, thermal layers',
+        'bottom': 'Thermal pants, heavy jeans or trousers',
+        'shoes': 'Insulated waterproof boots',
+        'accessories': 'Gloves, scarf, beanie, ear protection'
+    }),
+    'cold': MappingProxyType({
+        'layers': 'Moderate layering (2-3 layers)',
+        'outerwear': 'Winter coat or heavy jacket',
+        'bottom': 'Jeans with thermal layer or thick trousers',
+        'shoes': 'Boots or closed shoes with insulation',
+        'accessories': 'Gloves optional, scarf recommended'
+    }),
+    'cool': MappingProxyType({
+        'layers': 'Light layering (1-2 layers)',
+        'outerwear': 'Light jacket, sweater, or cardigan',
+        'bottom': 'Jeans, trousers, or light pants',
+        'shoes': 'Sneakers, casual shoes, or light boots',
+        'accessories': 'Optional scarf or light gloves'
+    }),
+    'warm': MappingProxyType({
+        'layers': 'Single layer or light layering',
+        'outerwear': 'None or light cardigan/shirt',
+        'bottom': 'Shorts, skirts, or light trousers',
+        'shoes': 'Breathable shoes, sneakers, or sandals',
+        'accessories': 'Sunglasses, hat, light scarf'
+    }),
+    'hot': MappingProxyType({
+        'layers': 'Minimal layers',
+        'outerwear': 'None or very light cover-up',
+        'bottom': 'Shorts, skirts, light dresses',
+        'shoes': 'Sandals, open shoes, breathable footwear',
+        'accessories': 'Sunglasses, hat, sunscreen essential'
+    })
+}
+
+# Condition flags that change get_dress_recommendation's output
+DRESS_OVERRIDE_FLAGS = frozenset({'rain', 'snow', 'wind', 'sun'})
+
+# Per-category get_clothing_recommendations lists (tuples; copied to lists per call)
+CLOTHING_BY_CATEGORY = {
+    'freezing': MappingProxyType({
+        "layers": ("Heavy winter coat", "Thermal underwear", "Thick sweater", "Wool pants"),
+        "accessories": ("Insulated gloves", "Wool scarf", "Winter beanie", "Thermal socks"),
+        "footwear": ("Insulated winter boots", "Waterproof boots"),
+        "materials": ("Wool", "Down", "Fleece", "Thermal fabrics"),
+        "colors": ("Dark colors (retain heat)",),
+        "tips": (
+            "Dress in multiple layers for insulation",
+            "Cover all exposed skin to prevent frostbite",
+            "Avoid cotton - it retains moisture"
+        )
+    }),
+    'cold': MappingProxyType({
+        "layers": ("Warm jacket or coat", "Long-sleeve shirt", "Sweater", "Jeans or trousers"),
+        "accessories": ("Light scarf", "Gloves (optional)"),
+        "footwear": ("Closed-toe shoes", "Boots", "Sneakers"),
+        "materials": ("Wool blends", "Cotton", "Denim"),
+        "colors": ("Neutral tones", "Earth colors"),
+        "tips": (
+            "Layer up for warmth and flexibility",
+            "A jacket is essential"
+        )
+    }),
+    'cool': MappingProxyType({
+        "layers": ("Light jacket or cardigan", "Long sleeves or t-shirt", "Jeans or casual pants"),
+        "accessories": ("Light scarf (optional)",),
+        "footwear": ("Sneakers", "Casual shoes", "Loafers"),
+        "materials": ("Cotton", "Linen blends", "Light denim"),
+        "colors": ("Versatile colors", "Spring/autumn tones"),
+        "tips": (
+            "Perfect weather for layering",
+            "Bring a light jacket for evening"
+        )
+    }),
+    'warm': MappingProxyType({
+        "layers": ("T-shirt or blouse", "Shorts or light pants", "Light dress"),
+        "accessories": ("Sunglasses", "Light hat"),
+        "footwear": ("Sandals", "Sneakers", "Casual shoes"),
+        "materials": ("Cotton", "Linen", "Breathable fabrics"),
+        "colors": ("Light colors", "Pastels", "Bright colors"),
+        "tips": (
+            "Stay cool and comfortable",
+            "Light, breathable fabrics are best"
+        )
+    }),
+    'hot': MappingProxyType({
+        "layers": ("Light breathable t-shirt", "Shorts", "Tank top", "Light dress"),
+        "accessories": ("Sunglasses", "Wide-brim hat", "Sunscreen"),
+        "footwear": ("Sandals", "Flip-flops", "Breathable sneakers"),
+        "materials": ("Light cotton", "Linen", "Moisture-wicking fabrics"),
+        "colors": ("White", "Light colors (reflect heat)", "Pastels"),
+        "tips": (
+            "Stay hydrated throughout the day",
+            "Avoid dark colors - they absorb heat",
+            "Seek shade during peak sun hours"
+        )
+    })
+}
+
+# Open-Meteo /forecast variables requested for each block
+CURRENT_FIELDS = [
+    "temperature_2m",
+    "relative_humidity_2m",
+    "apparent_temperature",
+    "precipitation",
+    "rain",
+    "showers",
+    "snowfall",
+    "weather_code",
+    "cloud_cover",
+    "pressure_msl",
+    "wind_speed_10m",
+    "wind_direction_10m",
+    "wind_gusts_10m"
+]
+DAILY_FIELDS = [
+    "weather_code",
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "apparent_temperature_max",
+    "apparent_temperature_min",
+    "precipitation_sum",
+    "rain_sum",
+    "showers_sum",
+    "snowfall_sum",
+    "precipitation_probability_max",
+    "wind_speed_10m_max",
+    "wind_gusts_10m_max",
+    "wind_direction_10m_dominant",
+    "sunrise",
+    "sunset"
+]
+HOURLY_FIELDS = [
+    "temperature_2m",
+    "relative_humidity_2m",
+    "apparent_temperature",
+    "precipitation_probability",
+    "precipitation",
+    "rain",
+    "showers",
+    "snowfall",
+    "weather_code",
+    "cloud_cover",
+    "wind_speed_10m",
+    "wind_direction_10m"
+]
+
+
+@lru_cache(maxsize=256)
+def _temperature_category(temp_c: float) -> str:
+    # Callers mostly pass rounded temperatures, so the cache stays small
+    return TEMP_NAMES[bisect_right(TEMP_BOUNDS, temp_c)]
+
+
+# Keywords the recommendation helpers look for in a condition string.
+# The lookahead lets overlapping matches through, so this finds exactly what
+# separate `keyword in condition` checks would.
+CONDITION_RE = re.compile(
+    r'(?=(rain|snow|wind|sun|thunderstorm|drizzle|showers|clear|cloudy))', re.I
+)
+
+
+@lru_cache(maxsize=64)
+def _condition_flags(condition: str) -> frozenset:
+    # Only ~30 distinct conditions exist, so nearly every call is a cache hit
+    return frozenset(match.lower() for match in CONDITION_RE.findall(condition))
+
+
+def _location_key(location) -> Optional[str]:
+    # Geocode cache key; None for missing or non-str locations (e.g. users without one)
+    if not isinstance(location, str):
+        return None
+    return location.strip().lower() or None
+
+
 class WeatherService:
     def __init__(self):
         self.base_url = "https://api.open-meteo.com/v1"
         self.geocoding_url = "https://geocoding-api.open-meteo.com/v1"
-        self.cache = {}
         self.cache_duration = 15 * 60  # 15 minutes in seconds
         
+        # Bounded caches: entries expire after cache_duration and the oldest are evicted
+        self._weather_cache = TTLCache(maxsize=512, ttl=self.cache_duration)
+        self._forecast_cache = TTLCache(maxsize=512, ttl=self.cache_duration)
+        self._hourly_cache = TTLCache(maxsize=512, ttl=self.cache_duration)
+        # City -> coordinates practically never changes, so geocodes live for a week
+        self._geo_cache = TTLCache(maxsize=4096, ttl=7 * 24 * 60 * 60)
+        # Names the geocoder found nothing for, kept briefly to absorb retries
+        self._geo_miss_cache = TTLCache(maxsize=1024, ttl=5 * 60)
+        # (ETag, Last-Modified, location_info) kept past geocode expiry for conditional refreshes
+        self._geo_validators = TTLCache(maxsize=4096, ttl=30 * 24 * 60 * 60)
+        self.timeout = (3.05, 10)  # (connect, read) seconds
+        
+        # One keep-alive session so repeat calls reuse the TLS connection
+        self.session = requests.Session()
+        # Explicit so the compressed transfer doesn't depend on library defaults
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+        )
+        self.session.mount("https://api.open-meteo.com", adapter)
+        self.session.mount("https://geocoding-api.open-meteo.com", adapter)
+        
+        # Created lazily: aiohttp sessions must be opened inside the running event loop
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+        
         # Temperature thresholds for outfit recommendations
-        self.temperature_categories = {
-            'freezing': {'min': -float('inf'), 'max': 0},
-            'cold': {'min': 0, 'max': 10},
-            'cool': {'min': 10, 'max': 20},
-            'warm': {'min': 20, 'max': 30},
-            'hot': {'min': 30, 'max': float('inf')}
-        }
+        self.temperature_categories = TEMPERATURE_CATEGORIES
     
     # ==================== NEW METHODS (Add to existing class) ====================
     
     def get_temperature_category(self, temp_c: float) -> str:
         """Get temperature category name"""
-        for category, bounds in self.temperature_categories.items():
-            if bounds['min'] <= temp_c < bounds['max']:
-                return category
-        return 'moderate'
+        return _temperature_category(temp_c)
     
     def get_weather_with_category(self, location: str) -> Optional[Dict]:
         """Get weather with temperature category for outfit suggestions"""
@@ -40,103 +297,71 @@ class WeatherService:
             weather['dress_recommendation'] = self.get_dress_recommendation(weather)
         return weather
     
+    async def aget_weather_with_category(self, location: str) -> Optional[Dict]:
+        """Async get_weather_with_category for use from request handlers"""
+        weather = await self.aget_current_weather(location)
+        if weather:
+            temp_c = weather.get('temperature', 20)
+            weather['category'] = self.get_temperature_category(temp_c)
+            weather['dress_recommendation'] = self.get_dress_recommendation(weather)
+        return weather
+    
     def get_dress_recommendation(self, weather: Dict) -> Dict:
         """Get detailed dress recommendations based on weather"""
         temp = weather.get('temperature', 20)
         condition = weather.get('condition', '').lower()
         category = self.get_temperature_category(temp)
         
-        recommendations = {
-            'layers': '',
-            'outerwear': '',
-            'bottom': '',
-            'shoes': '',
-            'accessories': ''
-        }
+        # Temperature-based recommendations (copied: condition overrides mutate it)
+        recommendations = dict(DRESS_BY_CATEGORY[category])
         
-        # Temperature-based recommendations
-        if category == 'freezing':
-            recommendations.update({
-                'layers': 'Heavy layering required (3+ layers)',
-                'outerwear': 'Insulated winter coat, thermal layers',
-                'bottom': 'Thermal pants, heavy jeans or trousers',
-                'shoes': 'Insulated waterproof boots',
-                'accessories': 'Gloves, scarf, beanie, ear protection'
-            })
-        elif category == 'cold':
-            recommendations.update({
-                'layers': 'Moderate layering (2-3 layers)',
-                'outerwear': 'Winter coat or heavy jacket',
-                'bottom': 'Jeans with thermal layer or thick trousers',
-                'shoes': 'Boots or closed shoes with insulation',
-                'accessories': 'Gloves optional, scarf recommended'
-            })
-        elif category == 'cool':
-            recommendations.update({
-                'layers': 'Light layering (1-2 layers)',
-                'outerwear': 'Light jacket, sweater, or cardigan',
-                'bottom': 'Jeans, trousers, or light pants',
-                'shoes': 'Sneakers, casual shoes, or light boots',
-                'accessories': 'Optional scarf or light gloves'
-            })
-        elif category == 'warm':
-            recommendations.update({
-                'layers': 'Single layer or light layering',
-                'outerwear': 'None or light cardigan/shirt',
-                'bottom': 'Shorts, skirts, or light trousers',
-                'shoes': 'Breathable shoes, sneakers, or sandals',
-                'accessories': 'Sunglasses, hat, light scarf'
-            })
-        elif category == 'hot':
-            recommendations.update({
-                'layers': 'Minimal layers',
-                'outerwear': 'None or very light cover-up',
-                'bottom': 'Shorts, skirts, light dresses',
-                'shoes': 'Sandals, open shoes, breathable footwear',
-                'accessories': 'Sunglasses, hat, sunscreen essential'
-            })
+        # Weather condition adjustments (most conditions, e.g. clear or overcast, have none)
+        flags = _condition_flags(condition)
+        if flags.isdisjoint(DRESS_OVERRIDE_FLAGS):
+            return recommendations
         
-        # Weather condition adjustments
-        if 'rain' in condition:
+        if 'rain' in flags:
             recommendations['shoes'] = 'Waterproof shoes or boots'
             recommendations['accessories'] = 'Umbrella, raincoat, waterproof bag'
         
-        if 'snow' in condition:
+        if 'snow' in flags:
             recommendations['shoes'] = 'Waterproof snow boots with good traction'
             recommendations['accessories'] = 'Winter gloves, waterproof gloves, thermal hat'
         
-        if 'wind' in condition:
+        if 'wind' in flags:
             recommendations['outerwear'] = 'Wind-resistant jacket'
             recommendations['accessories'] = 'Scarf to protect face, secure hat'
         
-        if 'sun' in condition:
+        if 'sun' in flags:
             recommendations['accessories'] = 'Sunglasses, hat, sunscreen essential'
         
         return recommendations
     
     def get_clothing_material_recommendations(self, category: str, condition: str) -> List[str]:
         """Get recommended materials based on weather"""
-        materials = []
+        # Ordered, de-duplicated accumulator
+        materials: Dict[str, None] = {}
+        flags = _condition_flags(condition)
         
-        if category in ['hot', 'warm'] or 'sun' in condition:
-            materials.extend(['Linen', 'Cotton', 'Rayon', 'Seersucker'])
+        if category in ['hot', 'warm'] or 'sun' in flags:
+            materials.update(dict.fromkeys(('Linen', 'Cotton', 'Rayon', 'Seersucker')))
         
         if category in ['cold', 'freezing']:
-            materials.extend(['Wool', 'Fleece', 'Down', 'Cashmere'])
+            materials.update(dict.fromkeys(('Wool', 'Fleece', 'Down', 'Cashmere')))
         
-        if 'rain' in condition:
-            materials.extend(['Gore-Tex', 'Nylon', 'Polyester', 'Waterproof fabrics'])
+        if 'rain' in flags:
+            materials.update(dict.fromkeys(('Gore-Tex', 'Nylon', 'Polyester', 'Waterproof fabrics')))
         
-        if 'wind' in condition:
-            materials.extend(['Windbreaker materials', 'Tightly woven fabrics'])
+        if 'wind' in flags:
+            materials.update(dict.fromkeys(('Windbreaker materials', 'Tightly woven fabrics')))
         
-        return list(set(materials))  # Remove duplicates
+        return list(materials)
     
     def get_weather_tips(self, weather: Dict) -> List[str]:
         """Get weather-specific style tips"""
         tips = []
         category = self.get_temperature_category(weather.get('temperature', 20))
-        condition = weather.get('condition', '').lower()
+        flags = _condition_flags(weather.get('condition', '').lower())
         temp = weather.get('temperature', 20)
         
         if category in ['cold', 'freezing']:
@@ -149,17 +374,17 @@ class WeatherService:
             tips.append('Wear loose-fitting clothes for better airflow')
             tips.append('Stay hydrated throughout the day')
         
-        if 'rain' in condition:
+        if 'rain' in flags:
             tips.append('Carry a compact umbrella or wear a waterproof jacket')
             tips.append('Choose darker colors that hide water spots')
             tips.append('Wear waterproof shoes to keep feet dry')
         
-        if 'sun' in condition:
+        if 'sun' in flags:
             tips.append('Apply sunscreen to exposed skin')
             tips.append('Wear a hat and sunglasses for UV protection')
             tips.append('Light colors reflect heat better than dark ones')
         
-        if 'wind' in condition:
+        if 'wind' in flags:
             tips.append('Wear close-fitting layers to prevent heat loss')
             tips.append('Choose wind-resistant outer layers')
             tips.append('Secure accessories that might blow away')
@@ -170,6 +395,15 @@ class WeatherService:
     
     def get_coordinates(self, location: str) -> Optional[Dict]:
         """Get latitude and longitude for a location using Open-Meteo geocoding"""
+        key = _location_key(location)
+        if key is None:
+            return None
+        if key in self._geo_miss_cache:
+            return None
+        cached = self._geo_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
             url = f"{self.geocoding_url}/search"
             params = {
@@ -179,24 +413,27 @@ class WeatherService:
                 "format": "json"
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            validator = self._geo_validators.get(key)
+            response = self.session.get(
+                url, params=params, timeout=self.timeout,
+                headers=self._conditional_headers(validator)
+            )
+            if response.status_code == 304 and validator:
+                # Unchanged upstream: reuse the stored result without a body transfer
+                self._geo_cache[key] = validator[2]
+                return validator[2]
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
-            if data.get("results") and len(data["results"]) > 0:
-                result = data["results"][0]
-                location_info = {
-                    "latitude": result.get("latitude"),
-                    "longitude": result.get("longitude"),
-                    "name": result.get("name"),
-                    "country": result.get("country"),
-                    "admin1": result.get("admin1"),  # State/Province
-                    "timezone": result.get("timezone")
-                }
+            location_info = self._parse_location(data)
+            if location_info:
                 logger.info(f"Coordinates for {location}: {location_info['latitude']}, {location_info['longitude']}")
+                self._geo_cache[key] = location_info
+                self._remember_validators(key, response.headers, location_info)
                 return location_info
             
             logger.warning(f"No coordinates found for location: {location}")
+            self._geo_miss_cache[key] = True
             return None
             
         except requests.RequestException as e:
@@ -219,79 +456,53 @@ class WeatherService:
             location_info
         )
     
+    @staticmethod
+    def _key_coords(lat: float, lon: float) -> Tuple[float, float]:
+        """
+        Quantize coordinates for cache keys
+        
+        Rounding to 2 decimals (~0.01° ≈ 1.1 km) lets nearby GPS fixes share an entry;
+        upstream requests still use the precise coordinates.
+        """
+        return round(lat, 2), round(lon, 2)
+    
+    def _cached(self, cache: TTLCache, key: str, producer: Callable[[], Optional[T]]) -> Optional[T]:
+        """Return cache[key], or produce, store and return it (None results are not cached)"""
+        hit = cache.get(key)
+        if hit is not None:
+            logger.info(f"Using cached {key}")
+            return hit
+        
+        value = producer()
+        if value is not None:
+            cache[key] = value
+        return value
+    
     def get_weather_by_coordinates(self, lat: float, lon: float, location_info: Optional[Dict] = None) -> Optional[Dict]:
         """Get current weather by coordinates (latitude, longitude)"""
+        key_lat, key_lon = self._key_coords(lat, lon)
+        return self._cached(
+            self._weather_cache,
+            f"weather_{key_lat}_{key_lon}",
+            lambda: self._fetch_weather(lat, lon, location_info)
+        )
+    
+    def _fetch_weather(self, lat: float, lon: float, location_info: Optional[Dict]) -> Optional[Dict]:
+        """Request and parse current weather (uncached)"""
         try:
-            # Check cache first
-            cache_key = f"weather_{lat}_{lon}"
-            current_time = datetime.now()
-            
-            if cache_key in self.cache:
-                cached_data, timestamp = self.cache[cache_key]
-                if (current_time - timestamp).seconds < self.cache_duration:
-                    logger.info(f"Using cached weather for ({lat}, {lon})")
-                    return cached_data
-            
             url = f"{self.base_url}/forecast"
             params = {
                 "latitude": lat,
                 "longitude": lon,
-                "current": [
-                    "temperature_2m",
-                    "relative_humidity_2m",
-                    "apparent_temperature",
-                    "precipitation",
-                    "rain",
-                    "showers",
-                    "snowfall",
-                    "weather_code",
-                    "cloud_cover",
-                    "pressure_msl",
-                    "surface_pressure",
-                    "wind_speed_10m",
-                    "wind_direction_10m",
-                    "wind_gusts_10m"
-                ],
+                "current": CURRENT_FIELDS,
                 "timezone": "auto"
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=self.timeout)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
-            current = data.get("current", {})
-            
-            # Map WMO weather codes to descriptions
-            weather_code = current.get("weather_code", 0)
-            condition, description = self._get_weather_description(weather_code)
-            
-            # Parse and format weather data
-            weather_info = {
-                "location": location_info.get("name") if location_info else f"Lat: {lat}, Lon: {lon}",
-                "country": location_info.get("country") if location_info else None,
-                "latitude": lat,
-                "longitude": lon,
-                "timezone": data.get("timezone"),
-                "temperature": round(current.get("temperature_2m", 0)),
-                "feels_like": round(current.get("apparent_temperature", 0)),
-                "humidity": current.get("relative_humidity_2m", 0),
-                "pressure": round(current.get("pressure_msl", 0)),
-                "condition": condition,
-                "description": description,
-                "weather_code": weather_code,
-                "wind_speed": round(current.get("wind_speed_10m", 0), 1),
-                "wind_direction": current.get("wind_direction_10m", 0),
-                "wind_gusts": round(current.get("wind_gusts_10m", 0), 1),
-                "cloud_cover": current.get("cloud_cover", 0),
-                "precipitation": current.get("precipitation", 0),
-                "rain": current.get("rain", 0),
-                "showers": current.get("showers", 0),
-                "snowfall": current.get("snowfall", 0),
-                "timestamp": current.get("time")
-            }
-            
-            # Cache the result
-            self.cache[cache_key] = (weather_info, current_time)
+            weather_info = self._parse_current(data, lat, lon, location_info)
             
             logger.info(f"Weather fetched for coordinates ({lat}, {lon}): {weather_info['temperature']}°C, {weather_info['condition']}")
             return weather_info
@@ -318,77 +529,30 @@ class WeatherService:
     
     def get_forecast_by_coordinates(self, lat: float, lon: float, days: int = 7) -> Optional[List[Dict]]:
         """Get weather forecast by coordinates"""
+        key_lat, key_lon = self._key_coords(lat, lon)
+        return self._cached(
+            self._forecast_cache,
+            f"forecast_{key_lat}_{key_lon}_{days}",
+            lambda: self._fetch_forecast(lat, lon, days)
+        )
+    
+    def _fetch_forecast(self, lat: float, lon: float, days: int) -> Optional[List[Dict]]:
+        """Request and parse the daily forecast (uncached)"""
         try:
-            cache_key = f"forecast_{lat}_{lon}_{days}"
-            current_time = datetime.now()
-            
-            if cache_key in self.cache:
-                cached_data, timestamp = self.cache[cache_key]
-                if (current_time - timestamp).seconds < self.cache_duration:
-                    logger.info(f"Using cached forecast for ({lat}, {lon})")
-                    return cached_data
-            
             url = f"{self.base_url}/forecast"
             params = {
                 "latitude": lat,
                 "longitude": lon,
-                "daily": [
-                    "weather_code",
-                    "temperature_2m_max",
-                    "temperature_2m_min",
-                    "apparent_temperature_max",
-                    "apparent_temperature_min",
-                    "precipitation_sum",
-                    "rain_sum",
-                    "showers_sum",
-                    "snowfall_sum",
-                    "precipitation_probability_max",
-                    "wind_speed_10m_max",
-                    "wind_gusts_10m_max",
-                    "wind_direction_10m_dominant",
-                    "sunrise",
-                    "sunset"
-                ],
+                "daily": DAILY_FIELDS,
                 "timezone": "auto",
                 "forecast_days": min(days, 16)  # Open-Meteo supports up to 16 days
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=self.timeout)
             response.raise_for_status()
-            data = response.json()
-            
-            daily = data.get("daily", {})
-            dates = daily.get("time", [])
+            data = orjson.loads(response.content)
             
-            forecasts = []
-            for i in range(len(dates)):
-                weather_code = daily.get("weather_code", [])[i]
-                condition, description = self._get_weather_description(weather_code)
-                
-                forecasts.append({
-                    "date": dates[i],
-                    "temperature_max": round(daily.get("temperature_2m_max", [])[i]),
-                    "temperature_min": round(daily.get("temperature_2m_min", [])[i]),
-                    "temperature": round((daily.get("temperature_2m_max", [])[i] + daily.get("temperature_2m_min", [])[i]) / 2),
-                    "feels_like_max": round(daily.get("apparent_temperature_max", [])[i]),
-                    "feels_like_min": round(daily.get("apparent_temperature_min", [])[i]),
-                    "condition": condition,
-                    "description": description,
-                    "weather_code": weather_code,
-                    "precipitation": round(daily.get("precipitation_sum", [])[i], 1),
-                    "rain": round(daily.get("rain_sum", [])[i], 1),
-                    "showers": round(daily.get("showers_sum", [])[i], 1),
-                    "snowfall": round(daily.get("snowfall_sum", [])[i], 1),
-                    "precipitation_probability": daily.get("precipitation_probability_max", [])[i],
-                    "wind_speed": round(daily.get("wind_speed_10m_max", [])[i], 1),
-                    "wind_gusts": round(daily.get("wind_gusts_10m_max", [])[i], 1),
-                    "wind_direction": daily.get("wind_direction_10m_dominant", [])[i],
-                    "sunrise": daily.get("sunrise", [])[i],
-                    "sunset": daily.get("sunset", [])[i]
-                })
-            
-            # Cache the result
-            self.cache[cache_key] = (forecasts, current_time)
+            forecasts = self._parse_daily(data.get("daily", {}))
             
             logger.info(f"Forecast fetched for coordinates ({lat}, {lon}): {len(forecasts)} days")
             return forecasts
@@ -402,236 +566,528 @@ class WeatherService:
     
     def get_hourly_forecast(self, lat: float, lon: float, hours: int = 24) -> Optional[List[Dict]]:
         """Get hourly weather forecast"""
+        key_lat, key_lon = self._key_coords(lat, lon)
+        return self._cached(
+            self._hourly_cache,
+            f"hourly_{key_lat}_{key_lon}_{hours}",
+            lambda: self._fetch_hourly(lat, lon, hours)
+        )
+    
+    def _fetch_hourly(self, lat: float, lon: float, hours: int) -> Optional[List[Dict]]:
+        """Request and parse the hourly forecast (uncached)"""
         try:
-            cache_key = f"hourly_{lat}_{lon}_{hours}"
-            current_time = datetime.now()
+            url = f"{self.base_url}/forecast"
+            params = {
+                "latitude": lat,
+                "longitude": lon,
+                "hourly": HOURLY_FIELDS,
+                "timezone": "auto",
+                "forecast_days": min((hours // 24) + 1, 16)
+            }
+            
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
             
-            if cache_key in self.cache:
-                cached_data, timestamp = self.cache[cache_key]
-                if (current_time - timestamp).seconds < self.cache_duration:
-                    logger.info(f"Using cached hourly forecast for ({lat}, {lon})")
-                    return cached_data
+            return self._parse_hourly(data.get("hourly", {}), hours)
             
+        except requests.RequestException as e:
+            logger.error(f"Hourly forecast API error for coordinates ({lat}, {lon}): {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error getting hourly forecast: {e}")
+            return None
+    
+    def get_bundle(self, location: str, days: int = 7, hours: int = 24) -> Optional[Dict]:
+        """
+        Get current weather, daily forecast and hourly forecast in one API call
+        
+        Each part is cached under the same key as its single-purpose method,
+        so later get_current_weather/get_forecast/get_hourly_forecast calls hit the cache.
+        """
+        location_info = self.get_coordinates(location)
+        if not location_info:
+            return None
+        
+        lat = location_info["latitude"]
+        lon = location_info["longitude"]
+        key_lat, key_lon = self._key_coords(lat, lon)
+        weather_key = f"weather_{key_lat}_{key_lon}"
+        forecast_key = f"forecast_{key_lat}_{key_lon}_{days}"
+        hourly_key = f"hourly_{key_lat}_{key_lon}_{hours}"
+        
+        bundle = {
+            "current": self._weather_cache.get(weather_key),
+            "forecast": self._forecast_cache.get(forecast_key),
+            "hourly": self._hourly_cache.get(hourly_key)
+        }
+        if all(part is not None for part in bundle.values()):
+            logger.info(f"Using cached weather bundle for ({lat}, {lon})")
+            return bundle
+        
+        try:
             url = f"{self.base_url}/forecast"
             params = {
                 "latitude": lat,
                 "longitude": lon,
-                "hourly": [
-                    "temperature_2m",
-                    "relative_humidity_2m",
-                    "apparent_temperature",
-                    "precipitation_probability",
-                    "precipitation",
-                    "rain",
-                    "showers",
-                    "snowfall",
-                    "weather_code",
-                    "cloud_cover",
-                    "wind_speed_10m",
-                    "wind_direction_10m"
-                ],
+                "current": CURRENT_FIELDS,
+                "daily": DAILY_FIELDS,
+                "hourly": HOURLY_FIELDS,
                 "timezone": "auto",
-                "forecast_days": min((hours // 24) + 1, 16)
+                "forecast_days": min(max(days, (hours // 24) + 1), 16)
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=self.timeout)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
-            hourly = data.get("hourly", {})
-            times = hourly.get("time", [])[:hours]
+            bundle = {
+                "current": self._parse_current(data, lat, lon, location_info),
+                "forecast": self._parse_daily(data.get("daily", {}))[:min(days, 16)],
+                "hourly": self._parse_hourly(data.get("hourly", {}), hours)
+            }
             
-            forecasts = []
-            for i in range(len(times)):
-                weather_code = hourly.get("weather_code", [])[i]
-                condition, description = self._get_weather_description(weather_code)
-                
-                forecasts.append({
-                    "time": times[i],
-                    "temperature": round(hourly.get("temperature_2m", [])[i]),
-                    "feels_like": round(hourly.get("apparent_temperature", [])[i]),
-                    "humidity": hourly.get("relative_humidity_2m", [])[i],
-                    "condition": condition,
-                    "description": description,
-                    "weather_code": weather_code,
-                    "precipitation": round(hourly.get("precipitation", [])[i], 1),
-                    "precipitation_probability": hourly.get("precipitation_probability", [])[i],
-                    "rain": round(hourly.get("rain", [])[i], 1),
-                    "showers": round(hourly.get("showers", [])[i], 1),
-                    "snowfall": round(hourly.get("snowfall", [])[i], 1),
-                    "cloud_cover": hourly.get("cloud_cover", [])[i],
-                    "wind_speed": round(hourly.get("wind_speed_10m", [])[i], 1),
-                    "wind_direction": hourly.get("wind_direction_10m", [])[i]
-                })
+            self._weather_cache[weather_key] = bundle["current"]
+            self._forecast_cache[forecast_key] = bundle["forecast"]
+            self._hourly_cache[hourly_key] = bundle["hourly"]
             
-            # Cache the result
-            self.cache[cache_key] = (forecasts, current_time)
+            logger.info(f"Weather bundle fetched for coordinates ({lat}, {lon})")
+            return bundle
             
+        except requests.RequestException as e:
+            logger.error(f"Weather bundle API error for coordinates ({lat}, {lon}): {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error getting weather bundle for coordinates ({lat}, {lon}): {e}")
+            return None
+    
+    def _parse_current(self, data: Dict, lat: float, lon: float, location_info: Optional[Dict]) -> Dict:
+        """Format the "current" block of a forecast response"""
+        current = data.get("current", {})
+        
+        # Map WMO weather codes to descriptions
+        weather_code = current.get("weather_code", 0)
+        condition, description = self._get_weather_description(weather_code)
+        
+        return {
+            "location": location_info.get("name") if location_info else f"Lat: {lat}, Lon: {lon}",
+            "country": location_info.get("country") if location_info else None,
+            "latitude": lat,
+            "longitude": lon,
+            "timezone": data.get("timezone"),
+            "temperature": round(current.get("temperature_2m", 0)),
+            "feels_like": round(current.get("apparent_temperature", 0)),
+            "humidity": current.get("relative_humidity_2m", 0),
+            "pressure": round(current.get("pressure_msl", 0)),
+            "condition": condition,
+            "description": description,
+            "weather_code": weather_code,
+            "wind_speed": round(current.get("wind_speed_10m", 0), 1),
+            "wind_direction": current.get("wind_direction_10m", 0),
+            "wind_gusts": round(current.get("wind_gusts_10m", 0), 1),
+            "cloud_cover": current.get("cloud_cover", 0),
+            "precipitation": current.get("precipitation", 0),
+            "rain": current.get("rain", 0),
+            "showers": current.get("showers", 0),
+            "snowfall": current.get("snowfall", 0),
+            "timestamp": current.get("time")
+        }
+    
+    def _parse_daily(self, daily: Dict) -> List[Dict]:
+        """Format the "daily" block of a forecast response, one dict per day"""
+        forecasts = []
+        for (date, weather_code, temp_max, temp_min, feels_max, feels_min, precipitation,
+             rain, showers, snowfall, precip_probability, wind_speed, wind_gusts,
+             wind_direction, sunrise, sunset) in zip(
+            daily.get("time", []),
+            daily.get("weather_code", []),
+            daily.get("temperature_2m_max", []),
+            daily.get("temperature_2m_min", []),
+            daily.get("apparent_temperature_max", []),
+            daily.get("apparent_temperature_min", []),
+            daily.get("precipitation_sum", []),
+            daily.get("rain_sum", []),
+            daily.get("showers_sum", []),
+            daily.get("snowfall_sum", []),
+            daily.get("precipitation_probability_max", []),
+            daily.get("wind_speed_10m_max", []),
+            daily.get("wind_gusts_10m_max", []),
+            daily.get("wind_direction_10m_dominant", []),
+            daily.get("sunrise", []),
+            daily.get("sunset", [])
+        ):
+            condition, description = self._get_weather_description(weather_code)
+            
+            forecasts.append({
+                "date": date,
+                "temperature_max": round(temp_max),
+                "temperature_min": round(temp_min),
+                "temperature": round((temp_max + temp_min) / 2),
+                "feels_like_max": round(feels_max),
+                "feels_like_min": round(feels_min),
+                "condition": condition,
+                "description": description,
+                "weather_code": weather_code,
+                "precipitation": round(precipitation, 1),
+                "rain": round(rain, 1),
+                "showers": round(showers, 1),
+                "snowfall": round(snowfall, 1),
+                "precipitation_probability": precip_probability,
+                "wind_speed": round(wind_speed, 1),
+                "wind_gusts": round(wind_gusts, 1),
+                "wind_direction": wind_direction,
+                "sunrise": sunrise,
+                "sunset": sunset
+            })
+        
+        return forecasts
+    
+    def _parse_hourly(self, hourly: Dict, hours: int) -> List[Dict]:
+        """Format the first `hours` entries of the "hourly" block of a forecast response"""
+        forecasts = []
+        for (timestamp, temperature, feels_like, humidity, weather_code, precipitation,
+             precip_probability, rain, showers, snowfall, cloud_cover, wind_speed,
+             wind_direction) in zip(
+            hourly.get("time", [])[:hours],
+            hourly.get("temperature_2m", []),
+            hourly.get("apparent_temperature", []),
+            hourly.get("relative_humidity_2m", []),
+            hourly.get("weather_code", []),
+            hourly.get("precipitation", []),
+            hourly.get("precipitation_probability", []),
+            hourly.get("rain", []),
+            hourly.get("showers", []),
+            hourly.get("snowfall", []),
+            hourly.get("cloud_cover", []),
+            hourly.get("wind_speed_10m", []),
+            hourly.get("wind_direction_10m", [])
+        ):
+            condition, description = self._get_weather_description(weather_code)
+            
+            forecasts.append({
+                "time": timestamp,
+                "temperature": round(temperature),
+                "feels_like": round(feels_like),
+                "humidity": humidity,
+                "condition": condition,
+                "description": description,
+                "weather_code": weather_code,
+                "precipitation": round(precipitation, 1),
+                "precipitation_probability": precip_probability,
+                "rain": round(rain, 1),
+                "showers": round(showers, 1),
+                "snowfall": round(snowfall, 1),
+                "cloud_cover": cloud_cover,
+                "wind_speed": round(wind_speed, 1),
+                "wind_direction": wind_direction
+            })
+        
+        return forecasts
+    
+    def _parse_location(self, data: Dict) -> Optional[Dict]:
+        """Format the first geocoding search result, if any"""
+        if data.get("results") and len(data["results"]) > 0:
+            result = data["results"][0]
+            return {
+                "latitude": result.get("latitude"),
+                "longitude": result.get("longitude"),
+                "name": result.get("name"),
+                "country": result.get("country"),
+                "admin1": result.get("admin1"),  # State/Province
+                "timezone": result.get("timezone")
+            }
+        return None
+    
+    # ==================== ASYNC BATCH LOOKUPS ====================
+    
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Return the shared aiohttp session, opening it on first use"""
+        if self._aio_session is None or self._aio_session.closed:
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, limit_per_host=16, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._aio_session
+    
+    async def _aget_json(self, url: str, params: Dict, headers: Optional[Dict] = None) -> tuple:
+        """
+        GET a JSON document; list params are sent comma-separated as Open-Meteo expects
+        
+        Returns (data, response headers); data is None on 304 Not Modified.
+        """
+        query = {
+            key: ",".join(value) if isinstance(value, list) else str(value)
+            for key, value in params.items()
+        }
+        session = await self._ensure_session()
+        async with session.get(url, params=query, headers=headers) as response:
+            if response.status == 304:
+                return None, response.headers
+            response.raise_for_status()
+            return orjson.loads(await response.read()), response.headers
+    
+    @staticmethod
+    def _conditional_headers(validator: Optional[tuple]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a stored geocode validator"""
+        headers = {}
+        if validator:
+            etag, last_modified, _ = validator
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return headers
+    
+    def _remember_validators(self, key: str, headers, location_info: Dict):
+        """Keep the response's ETag / Last-Modified so the next refresh can be conditional"""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if etag or last_modified:
+            self._geo_validators[key] = (etag, last_modified, location_info)
+    
+    async def _aget_coords(self, location: str) -> Optional[Dict]:
+        """Async counterpart of get_coordinates, sharing its cache"""
+        key = _location_key(location)
+        if key is None:
+            return None
+        if key in self._geo_miss_cache:
+            return None
+        cached = self._geo_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            validator = self._geo_validators.get(key)
+            data, headers = await self._aget_json(
+                f"{self.geocoding_url}/search",
+                {"name": location, "count": 1, "language": "en", "format": "json"},
+                self._conditional_headers(validator)
+            )
+            if data is None and validator:
+                self._geo_cache[key] = validator[2]
+                return validator[2]
+            
+            location_info = self._parse_location(data or {})
+            if location_info:
+                self._geo_cache[key] = location_info
+                self._remember_validators(key, headers, location_info)
+            else:
+                logger.warning(f"No coordinates found for location: {location}")
+                self._geo_miss_cache[key] = True
+            return location_info
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            logger.error(f"Geocoding API error for {location}: {e}")
+            return None
+    
+    async def _aget_weather_by_coords(self, lat: float, lon: float, location_info: Optional[Dict] = None) -> Optional[Dict]:
+        """Async counterpart of get_weather_by_coordinates, sharing its cache"""
+        key_lat, key_lon = self._key_coords(lat, lon)
+        cache_key = f"weather_{key_lat}_{key_lon}"
+        cached = self._weather_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            data, _ = await self._aget_json(
+                f"{self.base_url}/forecast",
+                {"latitude": lat, "longitude": lon, "current": CURRENT_FIELDS, "timezone": "auto"}
+            )
+            weather_info = self._parse_current(data, lat, lon, location_info)
+            self._weather_cache[cache_key] = weather_info
+            return weather_info
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Weather API error for coordinates ({lat}, {lon}): {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error getting weather for coordinates ({lat}, {lon}): {e}")
+            return None
+    
+    async def _aget_forecast_by_coords(self, lat: float, lon: float, days: int = 7) -> Optional[List[Dict]]:
+        """Async counterpart of get_forecast_by_coordinates, sharing its cache"""
+        key_lat, key_lon = self._key_coords(lat, lon)
+        cache_key = f"forecast_{key_lat}_{key_lon}_{days}"
+        cached = self._forecast_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            data, _ = await self._aget_json(
+                f"{self.base_url}/forecast",
+                {
+                    "latitude": lat,
+                    "longitude": lon,
+                    "daily": DAILY_FIELDS,
+                    "timezone": "auto",
+                    "forecast_days": min(days, 16)
+                }
+            )
+            forecasts = self._parse_daily(data.get("daily", {}))
+            self._forecast_cache[cache_key] = forecasts
             return forecasts
             
-        except requests.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Forecast API error for coordinates ({lat}, {lon}): {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error getting forecast for coordinates ({lat}, {lon}): {e}")
+            return None
+    
+    async def _aget_hourly_by_coords(self, lat: float, lon: float, hours: int = 24) -> Optional[List[Dict]]:
+        """Async counterpart of get_hourly_forecast, sharing its cache"""
+        key_lat, key_lon = self._key_coords(lat, lon)
+        cache_key = f"hourly_{key_lat}_{key_lon}_{hours}"
+        cached = self._hourly_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            data, _ = await self._aget_json(
+                f"{self.base_url}/forecast",
+                {
+                    "latitude": lat,
+                    "longitude": lon,
+                    "hourly": HOURLY_FIELDS,
+                    "timezone": "auto",
+                    "forecast_days": min((hours // 24) + 1, 16)
+                }
+            )
+            hourly = self._parse_hourly(data.get("hourly", {}), hours)
+            self._hourly_cache[cache_key] = hourly
+            return hourly
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             logger.error(f"Hourly forecast API error for coordinates ({lat}, {lon}): {e}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error getting hourly forecast: {e}")
             return None
     
-    def _get_weather_description(self, code: int) -> tuple:
+    async def aget_current_weather(self, location: str) -> Optional[Dict]:
         """
-        Convert WMO Weather interpretation codes to human-readable descriptions
-        https://open-meteo.com/en/docs
+        Async get_current_weather for use from request handlers
+        
+        Cache hits return without any I/O; misses go over aiohttp so the
+        event loop is never blocked.
         """
-        weather_codes = {
-            0: ("Clear", "Clear sky"),
-            1: ("Mainly Clear", "Mainly clear sky"),
-            2: ("Partly Cloudy", "Partly cloudy"),
-            3: ("Overcast", "Overcast"),
-            45: ("Fog", "Foggy"),
-            48: ("Fog", "Depositing rime fog"),
-            51: ("Drizzle", "Light drizzle"),
-            53: ("Drizzle", "Moderate drizzle"),
-            55: ("Drizzle", "Dense drizzle"),
-            56: ("Freezing Drizzle", "Light freezing drizzle"),
-            57: ("Freezing Drizzle", "Dense freezing drizzle"),
-            61: ("Rain", "Slight rain"),
-            63: ("Rain", "Moderate rain"),
-            65: ("Rain", "Heavy rain"),
-            66: ("Freezing Rain", "Light freezing rain"),
-            67: ("Freezing Rain", "Heavy freezing rain"),
-            71: ("Snow", "Slight snow fall"),
-            73: ("Snow", "Moderate snow fall"),
-            75: ("Snow", "Heavy snow fall"),
-            77: ("Snow", "Snow grains"),
-            80: ("Showers", "Slight rain showers"),
-            81: ("Showers", "Moderate rain showers"),
-            82: ("Showers", "Violent rain showers"),
-            85: ("Snow Showers", "Slight snow showers"),
-            86: ("Snow Showers", "Heavy snow showers"),
-            95: ("Thunderstorm", "Thunderstorm"),
-            96: ("Thunderstorm", "Thunderstorm with slight hail"),
-            99: ("Thunderstorm", "Thunderstorm with heavy hail")
-        }
+        location_info = await self._aget_coords(location)
+        if not location_info:
+            return None
         
-        return weather_codes.get(code, ("Unknown", "Unknown condition"))
+        return await self._aget_weather_by_coords(
+            location_info["latitude"],
+            location_info["longitude"],
+            location_info
+        )
+    
+    async def aget_forecast(self, location: str, days: int = 7) -> Optional[List[Dict]]:
+        """Async get_forecast for use from request handlers"""
+        location_info = await self._aget_coords(location)
+        if not location_info:
+            return None
+        
+        return await self._aget_forecast_by_coords(
+            location_info["latitude"],
+            location_info["longitude"],
+            days
+        )
+    
+    async def aget_coordinates(self, location: str) -> Optional[Dict]:
+        """Async get_coordinates for use from request handlers"""
+        return await self._aget_coords(location)
+    
+    async def aget_hourly_forecast(self, lat: float, lon: float, hours: int = 24) -> Optional[List[Dict]]:
+        """Async get_hourly_forecast for use from request handlers"""
+        return await self._aget_hourly_by_coords(lat, lon, hours)
+    
+    async def aget_weather_batch(self, locations: List[str]) -> List:
+        """
+        Get current weather for several locations concurrently
+        
+        Returns one entry per location, in order: the weather dict, None when
+        the lookup failed, or the exception raised for that location.
+        """
+        return await asyncio.gather(
+            *(self.aget_current_weather(location) for location in locations),
+            return_exceptions=True
+        )
+    
+    async def aclose(self):
+        """Close the aiohttp session (call on application shutdown)"""
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+    
+    @staticmethod
+    def _get_weather_description(code: int) -> tuple:
+        """Convert WMO Weather interpretation codes to human-readable descriptions"""
+        try:
+            # Float codes such as 1.0 matched the old dict keys; 1.5 or "1" did not
+            index = int(code)
+            if index == code and index >= 0:
+                return _WMO_TABLE[index]
+        except (IndexError, TypeError, ValueError, OverflowError):
+            pass
+        return UNKNOWN_WEATHER
     
     def get_clothing_recommendations(self, weather: Dict) -> Dict:
         """Get clothing recommendations based on weather"""
         temp = weather.get("temperature", 20)
         feels_like = weather.get("feels_like", temp)
-        condition = weather.get("condition", "Clear").lower()
+        flags = _condition_flags(weather.get("condition", "Clear").lower())
         humidity = weather.get("humidity", 50)
         wind_speed = weather.get("wind_speed", 0)
         precipitation = weather.get("precipitation", 0)
         
-        recommendations = {
-            "layers": [],
-            "accessories": [],
-            "footwear": [],
-            "materials": [],
-            "colors": [],
-            "tips": []
-        }
-        
         # Temperature-based recommendations (using feels_like for better accuracy)
         effective_temp = feels_like
         category = self.get_temperature_category(effective_temp)
         
-        if category == 'freezing':
-            recommendations["layers"] = ["Heavy winter coat", "Thermal underwear", "Thick sweater", "Wool pants"]
-            recommendations["accessories"] = ["Insulated gloves", "Wool scarf", "Winter beanie", "Thermal socks"]
-            recommendations["footwear"] = ["Insulated winter boots", "Waterproof boots"]
-            recommendations["materials"] = ["Wool", "Down", "Fleece", "Thermal fabrics"]
-            recommendations["colors"] = ["Dark colors (retain heat)"]
-            recommendations["tips"] = [
-                "Dress in multiple layers for insulation",
-                "Cover all exposed skin to prevent frostbite",
-                "Avoid cotton - it retains moisture"
-            ]
-        elif category == 'cold':
-            recommendations["layers"] = ["Warm jacket or coat", "Long-sleeve shirt", "Sweater", "Jeans or trousers"]
-            recommendations["accessories"] = ["Light scarf", "Gloves (optional)"]
-            recommendations["footwear"] = ["Closed-toe shoes", "Boots", "Sneakers"]
-            recommendations["materials"] = ["Wool blends", "Cotton", "Denim"]
-            recommendations["colors"] = ["Neutral tones", "Earth colors"]
-            recommendations["tips"] = [
-                "Layer up for warmth and flexibility",
-                "A jacket is essential"
-            ]
-        elif category == 'cool':
-            recommendations["layers"] = ["Light jacket or cardigan", "Long sleeves or t-shirt", "Jeans or casual pants"]
-            recommendations["accessories"] = ["Light scarf (optional)"]
-            recommendations["footwear"] = ["Sneakers", "Casual shoes", "Loafers"]
-            recommendations["materials"] = ["Cotton", "Linen blends", "Light denim"]
-            recommendations["colors"] = ["Versatile colors", "Spring/autumn tones"]
-            recommendations["tips"] = [
-                "Perfect weather for layering",
-                "Bring a light jacket for evening"
-            ]
-        elif category == 'warm':
-            recommendations["layers"] = ["T-shirt or blouse", "Shorts or light pants", "Light dress"]
-            recommendations["accessories"] = ["Sunglasses", "Light hat"]
-            recommendations["footwear"] = ["Sandals", "Sneakers", "Casual shoes"]
-            recommendations["materials"] = ["Cotton", "Linen", "Breathable fabrics"]
-            recommendations["colors"] = ["Light colors", "Pastels", "Bright colors"]
-            recommendations["tips"] = [
-                "Stay cool and comfortable",
-                "Light, breathable fabrics are best"
-            ]
-        else:  # 'hot'
-            recommendations["layers"] = ["Light breathable t-shirt", "Shorts", "Tank top", "Light dress"]
-            recommendations["accessories"] = ["Sunglasses", "Wide-brim hat", "Sunscreen"]
-            recommendations["footwear"] = ["Sandals", "Flip-flops", "Breathable sneakers"]
-            recommendations["materials"] = ["Light cotton", "Linen", "Moisture-wicking fabrics"]
-            recommendations["colors"] = ["White", "Light colors (reflect heat)", "Pastels"]
-            recommendations["tips"] = [
-                "Stay hydrated throughout the day",
-                "Avoid dark colors - they absorb heat",
-                "Seek shade during peak sun hours"
-            ]
+        # Ordered dicts as accumulators: re-adding an entry is a no-op, so no dedup pass
+        recommendations = {
+            key: dict.fromkeys(values) for key, values in CLOTHING_BY_CATEGORY[category].items()
+        }
+        accessories = recommendations["accessories"]
+        materials = recommendations["materials"]
+        tips = recommendations["tips"]
         
         # Condition-based additions
-        if "rain" in condition or "drizzle" in condition or "showers" in condition or precipitation > 0:
-            if "Umbrella" not in recommendations["accessories"]:
-                recommendations["accessories"].append("Umbrella")
-            recommendations["footwear"] = ["Waterproof shoes", "Rain boots", "Water-resistant sneakers"]
-            if "Bring waterproof outerwear" not in recommendations["tips"]:
-                recommendations["tips"].append("Bring waterproof outerwear")
-            recommendations["materials"].append("Waterproof/water-resistant fabrics")
-        
-        if "snow" in condition or weather.get("snowfall", 0) > 0:
-            if "Insulated gloves" not in recommendations["accessories"]:
-                recommendations["accessories"].extend(["Insulated gloves", "Warm winter hat"])
-            recommendations["footwear"] = ["Insulated winter boots", "Waterproof snow boots"]
-            recommendations["tips"].append("Watch for slippery surfaces")
-            recommendations["tips"].append("Waterproof everything")
-        
-        if "thunderstorm" in condition:
-            recommendations["tips"].append("Stay indoors during thunderstorm")
-            recommendations["accessories"].append("Umbrella (avoid open areas)")
+        if not flags.isdisjoint(("rain", "drizzle", "showers")) or precipitation > 0:
+            accessories["Umbrella"] = None
+            recommendations["footwear"] = dict.fromkeys(("Waterproof shoes", "Rain boots", "Water-resistant sneakers"))
+            tips["Bring waterproof outerwear"] = None
+            materials["Waterproof/water-resistant fabrics"] = None
+        
+        if "snow" in flags or weather.get("snowfall", 0) > 0:
+            if "Insulated gloves" not in accessories:
+                accessories.update(dict.fromkeys(("Insulated gloves", "Warm winter hat")))
+            recommendations["footwear"] = dict.fromkeys(("Insulated winter boots", "Waterproof snow boots"))
+            tips["Watch for slippery surfaces"] = None
+            tips["Waterproof everything"] = None
+        
+        if "thunderstorm" in flags:
+            tips["Stay indoors during thunderstorm"] = None
+            accessories["Umbrella (avoid open areas)"] = None
         
         # Wind adjustments
         if wind_speed > 20:
-            recommendations["tips"].append("Wear wind-resistant outer layer")
-            recommendations["materials"].append("Wind-resistant fabrics")
+            tips["Wear wind-resistant outer layer"] = None
+            materials["Wind-resistant fabrics"] = None
         
         # Humidity adjustments
         if humidity > 70 and effective_temp > 20:
-            recommendations["tips"].append("High humidity - choose moisture-wicking fabrics")
-            recommendations["materials"].append("Moisture-wicking materials")
+            tips["High humidity - choose moisture-wicking fabrics"] = None
+            materials["Moisture-wicking materials"] = None
         
         # Sun protection
-        if "clear" in condition or "cloudy" in condition:
-            if effective_temp > 20 and "Sunglasses" not in recommendations["accessories"]:
-                recommendations["accessories"].append("Sunglasses")
+        if "clear" in flags or "cloudy" in flags:
+            if effective_temp > 20:
+                accessories["Sunglasses"] = None
             if effective_temp > 25:
-                recommendations["tips"].append("Apply sunscreen (SPF 30+)")
+                tips["Apply sunscreen (SPF 30+)"] = None
         
-        # Remove duplicates while preserving order
-        for key in recommendations:
-            if isinstance(recommendations[key], list):
-                recommendations[key] = list(dict.fromkeys(recommendations[key]))
-        
-        return recommendations
+        return {key: list(values) for key, values in recommendations.items()}
     
     def generate_clothing_recommendations(self, weather: Dict) -> Dict:
         """Alias for get_clothing_recommendations for compatibility"""
@@ -639,8 +1095,14 @@ class WeatherService:
     
     def clear_cache(self):
         """Clear all cached weather data"""
-        self.cache.clear()
+        for cache in (self._weather_cache, self._forecast_cache, self._hourly_cache,
+                      self._geo_cache, self._geo_miss_cache, self._geo_validators):
+            cache.clear()
         logger.info("Weather cache cleared")
+    
+    def close(self):
+        """Close pooled HTTP connections (call on application shutdown)"""
+        self.session.close()
 
 # Singleton instance
 weather_service = WeatherService()
\ No newline at end of file
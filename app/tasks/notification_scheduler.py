@@ -46,6 +46,7 @@ class NotificationScheduler:
                     "notification_settings.notifications_enabled": True
                 }).to_list(length=None)
                 
+                due_user_ids = []
                 for user in users:
                     settings = user.get("notification_settings", {})
                     reminder_time = settings.get("daily_outfit_time", "09:00")
@@ -65,22 +66,25 @@ class NotificationScheduler:
                                 if last_sent_date == now.date():
                                     continue
                             
-                            # Send reminder
-                            await push_notification_service.send_daily_outfit_reminder(
-                                user_id=str(user["_id"]),
-                                db=db
-                            )
-                            
-                            # Update last sent time
-                            await db.users.update_one(
-                                {"_id": user["_id"]},
-                                {"$set": {"last_daily_reminder": now}}
-                            )
+                            due_user_ids.append(user["_id"])
                             
                     except ValueError:
                         logger.error(f"Invalid reminder time format: {reminder_time}")
                         continue
                 
+                if due_user_ids:
+                    # Send reminders (weather fetched once per location)
+                    await push_notification_service.send_daily_reminders_bulk(
+                        user_ids=[str(user_id) for user_id in due_user_ids],
+                        db=db
+                    )
+                    
+                    # Update last sent time
+                    await db.users.update_many(
+                        {"_id": {"$in": due_user_ids}},
+                        {"$set": {"last_daily_reminder": now}}
+                    )
+                
                 # Sleep for 1 minute before next check
                 await asyncio.sleep(60)
                 
@@ -106,7 +110,7 @@ class NotificationScheduler:
                         
                         # Get weather
                         from app.services.weather_service import weather_service
-                        weather = weather_service.get_current_weather(location)
+                        weather = await weather_service.aget_current_weather(location)
                         
                         if weather:
                             condition = weather.get("condition", "").lower()
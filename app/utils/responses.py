@@ -0,0 +1,25 @@
+"""
+Response classes for Fashion AI routes
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson
+
+    Accepts raw MongoDB documents: ObjectIds (and any other type orjson
+    does not know) are serialized with str(). Datetimes are written as
+    ISO 8601 natively.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
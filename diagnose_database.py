@@ -7,40 +7,143 @@ import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
-logging.basicConfig(level=logging.INFO)
+# Log records are written to stderr by a listener thread, so logging never blocks the event loop
+log_queue = queue.Queue(-1)
+# QueueHandler formats the record (basicConfig format); the listener just writes the message
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+log_listener.start()
 logger = logging.getLogger(__name__)
 
 MONGODB_URL = "mongodb://localhost:27017"
 DATABASE_NAME = "Outfit"
 USER_ID = "694f8c9625fdcfe41c47422e"
 
+# Only the fields the report prints (skips images / embeddings on the wire)
+USER_FIELDS = {"email": 1}
+CLOTHING_FIELDS = {"item_name": 1, "category": 1, "color": 1, "user_id": 1, "created_at": 1}
+OUTFIT_FIELDS = {"name": 1, "user_id": 1, "items.item_name": 1, "items.category": 1}
+# Documents listed per collection; totals come from the server-side count
+SAMPLE_SIZE = 25
+
+
+async def ensure_user_indexes(db):
+    """Index user_id on clothing/outfits so the per-user counts avoid a collection scan (no-op if present)"""
+    await asyncio.gather(
+        db.clothing.create_index("user_id"),
+        db.outfits.create_index("user_id"),
+    )
+
+
+async def collection_report(collection, projection):
+    """Total and a projected sample of the collection"""
+    return await asyncio.gather(
+        collection.estimated_document_count(),
+        collection.find({}, projection).limit(SAMPLE_SIZE).to_list(SAMPLE_SIZE),
+    )
+
+
+# (lookup field, collection, local field) for the target user's per-format counts
+OWNED_COUNTS = (
+    ("clothing_oid", "clothing", "_id"),
+    ("clothing_str", "clothing", "user_id_str"),
+    ("outfits_oid", "outfits", "_id"),
+    ("outfits_str", "outfits", "user_id_str"),
+)
+
+
+def target_user_pipeline(target_oid):
+    """Target user plus clothing/outfit counts for both user_id formats in one query (MongoDB 3.6+)"""
+    pipeline = [
+        {"$match": {"_id": target_oid}},
+        {"$project": USER_FIELDS},
+        # String copy of the id so the string-format lookups can join on user_id too
+        {"$addFields": {"user_id_str": {"$literal": USER_ID}}},
+    ]
+    for name, collection, local_field in OWNED_COUNTS:
+        pipeline.append({
+            # let/$expr join: localField together with a pipeline needs MongoDB 5.0+
+            "$lookup": {
+                "from": collection,
+                "let": {"owner": f"${local_field}"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$user_id", "$$owner"]}}},
+                    {"$count": "n"},
+                ],
+                "as": name,
+            }
+        })
+    return pipeline
+
+
+async def target_user_report(db, target_oid):
+    """(target user or None, clothing by ObjectId, clothing by string, outfits by ObjectId, outfits by string)"""
+    found = await db.users.aggregate(target_user_pipeline(target_oid)).to_list(1)
+    if found:
+        user = found[0]
+        return (user, *(user[name][0]["n"] if user[name] else 0 for name, _, _ in OWNED_COUNTS))
+    
+    # No user document to join from: count directly so orphaned items still show up
+    counts = await asyncio.gather(
+        db.clothing.count_documents({"user_id": target_oid}),
+        db.clothing.count_documents({"user_id": USER_ID}),
+        db.outfits.count_documents({"user_id": target_oid}),
+        db.outfits.count_documents({"user_id": USER_ID}),
+    )
+    return (None, *counts)
+
 async def diagnose_database():
     """Diagnose database state"""
     
+    # Parsed once; every ObjectId-format query below uses it
+    target_oid = ObjectId(USER_ID)
+    
+    client = None
     try:
-        client = AsyncIOMotorClient(MONGODB_URL)
+        # Small pool for a handful of concurrent queries; fail fast if the server is unreachable.
+        # zstd needs the optional zstandard package, otherwise pymongo falls back to zlib.
+        client = AsyncIOMotorClient(
+            MONGODB_URL,
+            maxPoolSize=8,
+            compressors="zstd,zlib",
+            serverSelectionTimeoutMS=3000,
+            connectTimeoutMS=2000,
+        )
         db = client[DATABASE_NAME]
         
         logger.info("="*70)
         logger.info("DATABASE DIAGNOSTIC REPORT")
         logger.info("="*70)
         
+        await ensure_user_indexes(db)
+        
+        # The queries are independent: overlap their round-trips, then report
+        collections, users, target_report, clothing_report, outfits_report = await asyncio.gather(
+            db.list_collection_names(),
+            db.users.find({}, projection=USER_FIELDS).to_list(length=None),
+            target_user_report(db, target_oid),
+            collection_report(db.clothing, CLOTHING_FIELDS),
+            collection_report(db.outfits, OUTFIT_FIELDS),
+        )
+        target_user, items_objectid, items_string, outfits_objectid, outfits_string = target_report
+        
         # Check all collections
-        collections = await db.list_collection_names()
         logger.info(f"\n📚 Available Collections: {collections}")
         
         # Check users
         logger.info("\n" + "="*70)
         logger.info("👤 USERS")
         logger.info("="*70)
-        users = await db.users.find({}).to_list(length=None)
-        logger.info(f"Total users: {len(users)}")
-        for user in users:
-            logger.info(f"  - {user.get('email')} (ID: {user.get('_id')})")
+        logger.info("Total users: %d", len(users))
+        if users:
+            logger.info("\n".join(
+                "  - %s (ID: %s)" % (user.get('email'), user.get('_id')) for user in users
+            ))
         
         # Check if target user exists
-        target_user = await db.users.find_one({"_id": ObjectId(USER_ID)})
         if target_user:
             logger.info(f"\n✅ Target user found: {target_user.get('email')}")
         else:
@@ -52,98 +155,96 @@ async def diagnose_database():
         logger.info("👔 CLOTHING COLLECTION")
         logger.info("="*70)
         
-        # Try different query formats
-        all_clothing = await db.clothing.find({}).to_list(length=None)
-        logger.info(f"Total clothing items (all users): {len(all_clothing)}")
+        clothing_total, clothing_sample = clothing_report
+        logger.info(f"Total clothing items (all users): {clothing_total}")
         
-        if all_clothing:
-            logger.info("\n📦 All clothing items in database:")
-            for idx, item in enumerate(all_clothing, 1):
+        if clothing_sample:
+            # One log record for the whole listing instead of five per item
+            buf = ["\n📦 Clothing items in database (first %d):" % len(clothing_sample)]
+            for idx, item in enumerate(clothing_sample, 1):
                 user_id = item.get('user_id')
-                user_id_type = type(user_id).__name__
-                logger.info(f"\n  {idx}. {item.get('item_name')}")
-                logger.info(f"     Category: {item.get('category')}")
-                logger.info(f"     Color: {item.get('color')}")
-                logger.info(f"     User ID: {user_id} (type: {user_id_type})")
-                logger.info(f"     Created: {item.get('created_at')}")
+                buf.append("\n  %d. %s" % (idx, item.get('item_name')))
+                buf.append("     Category: %s" % item.get('category'))
+                buf.append("     Color: %s" % item.get('color'))
+                buf.append("     User ID: %s (type: %s)" % (user_id, type(user_id).__name__))
+                buf.append("     Created: %s" % item.get('created_at'))
+            logger.info("\n".join(buf))
         
         # Try to find items for target user with different formats
         logger.info(f"\n🔍 Searching for items belonging to user {USER_ID}...")
         
-        # Try ObjectId format
-        items_objectid = await db.clothing.find({"user_id": ObjectId(USER_ID)}).to_list(length=None)
-        logger.info(f"  - Query with ObjectId: {len(items_objectid)} items")
-        
-        # Try string format
-        items_string = await db.clothing.find({"user_id": USER_ID}).to_list(length=None)
-        logger.info(f"  - Query with String: {len(items_string)} items")
+        logger.info(f"  - Query with ObjectId: {items_objectid} items")
+        logger.info(f"  - Query with String: {items_string} items")
         
         # Check outfits
         logger.info("\n" + "="*70)
         logger.info("👗 OUTFITS COLLECTION")
         logger.info("="*70)
         
-        all_outfits = await db.outfits.find({}).to_list(length=None)
-        logger.info(f"Total outfits (all users): {len(all_outfits)}")
+        outfits_total, outfits_sample = outfits_report
+        logger.info(f"Total outfits (all users): {outfits_total}")
         
-        if all_outfits:
-            logger.info("\n📦 All outfits in database:")
-            for idx, outfit in enumerate(all_outfits, 1):
+        if outfits_sample:
+            buf = ["\n📦 Outfits in database (first %d):" % len(outfits_sample)]
+            for idx, outfit in enumerate(outfits_sample, 1):
                 user_id = outfit.get('user_id')
-                user_id_type = type(user_id).__name__
                 items = outfit.get('items', [])
-                logger.info(f"\n  {idx}. {outfit.get('name', 'Unnamed')}")
-                logger.info(f"     Items: {len(items)}")
-                logger.info(f"     User ID: {user_id} (type: {user_id_type})")
+                buf.append("\n  %d. %s" % (idx, outfit.get('name', 'Unnamed')))
+                buf.append("     Items: %d" % len(items))
+                buf.append("     User ID: %s (type: %s)" % (user_id, type(user_id).__name__))
                 
                 # Show items in this outfit
                 if items:
-                    logger.info(f"     Contains:")
+                    buf.append("     Contains:")
                     for item in items:
-                        logger.info(f"       - {item.get('item_name')} ({item.get('category')})")
+                        buf.append("       - %s (%s)" % (item.get('item_name'), item.get('category')))
+            logger.info("\n".join(buf))
         
         # Try to find outfits for target user
         logger.info(f"\n🔍 Searching for outfits belonging to user {USER_ID}...")
         
-        outfits_objectid = await db.outfits.find({"user_id": ObjectId(USER_ID)}).to_list(length=None)
-        logger.info(f"  - Query with ObjectId: {len(outfits_objectid)} outfits")
-        
-        outfits_string = await db.outfits.find({"user_id": USER_ID}).to_list(length=None)
-        logger.info(f"  - Query with String: {len(outfits_string)} outfits")
+        logger.info(f"  - Query with ObjectId: {outfits_objectid} outfits")
+        logger.info(f"  - Query with String: {outfits_string} outfits")
         
         # Summary
         logger.info("\n" + "="*70)
         logger.info("📊 SUMMARY")
         logger.info("="*70)
-        logger.info(f"Total clothing items in DB: {len(all_clothing)}")
-        logger.info(f"Target user's clothing (ObjectId): {len(items_objectid)}")
-        logger.info(f"Target user's clothing (String): {len(items_string)}")
-        logger.info(f"Total outfits in DB: {len(all_outfits)}")
-        logger.info(f"Target user's outfits (ObjectId): {len(outfits_objectid)}")
-        logger.info(f"Target user's outfits (String): {len(outfits_string)}")
+        logger.info(f"Total clothing items in DB: {clothing_total}")
+        logger.info(f"Target user's clothing (ObjectId): {items_objectid}")
+        logger.info(f"Target user's clothing (String): {items_string}")
+        logger.info(f"Total outfits in DB: {outfits_total}")
+        logger.info(f"Target user's outfits (ObjectId): {outfits_objectid}")
+        logger.info(f"Target user's outfits (String): {outfits_string}")
         
         # Diagnosis
         logger.info("\n" + "="*70)
         logger.info("🔬 DIAGNOSIS")
         logger.info("="*70)
         
-        if len(all_clothing) == 0:
+        if clothing_total == 0:
             logger.error("❌ PROBLEM: Clothing collection is completely empty!")
             logger.error("   The migration script may have failed silently.")
             logger.error("   OR items were deleted after migration.")
-        elif len(items_objectid) == 0 and len(all_clothing) > 0:
+        elif items_objectid == 0 and clothing_total > 0:
             logger.error("❌ PROBLEM: Clothing items exist but not for your user!")
             logger.error("   User ID mismatch - items belong to different user.")
         
-        if len(outfits_objectid) > 0:
-            logger.info(f"✅ Found {len(outfits_objectid)} outfits for target user")
+        if outfits_objectid > 0:
+            logger.info(f"✅ Found {outfits_objectid} outfits for target user")
             logger.info("   We can re-run migration to extract items from these outfits.")
         
-        client.close()
-        
     except Exception as e:
         logger.error(f"❌ Diagnostic failed: {e}", exc_info=True)
+    finally:
+        # Release pooled sockets on the error path too
+        if client is not None:
+            client.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(diagnose_database())
\ No newline at end of file
+    try:
+        asyncio.run(diagnose_database())
+    finally:
+        # Flush queued records before exit
+        log_listener.stop()
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Taste vector seeding, stored wear counters and concurrent updates
+"""
+
+import copy
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from bson import ObjectId
+
+from app.services import personalized_ai_service as service_module
+from app.services.personalized_ai_service import PersonalizedAIService
+
+
+def _lookup(doc, field):
+    for part in field.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = _lookup(doc, field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$ne" in condition and value == condition["$ne"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        return FakeCursor([doc for doc in self.docs if _matches(doc, query)])
+
+    async def find_one(self, query, projection=None):
+        doc = next((doc for doc in self.docs if _matches(doc, query)), None)
+        return copy.deepcopy(doc)
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update["$set"])
+                return SimpleNamespace(matched_count=1)
+        return SimpleNamespace(matched_count=0)
+
+
+class FakeDatabase:
+    def __init__(self, users, outfit_history):
+        self.users = FakeCollection(users)
+        self.outfit_history = FakeCollection(outfit_history)
+
+
+class TasteVectorSeedTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.user_oid = ObjectId()
+        self.user_id = str(self.user_oid)
+        self.older_items = [{"id": "a", "color": "Red", "category": "Top"}]
+        self.rated_items = [{"id": "b", "color": "Blue", "category": "Bottom"}]
+        self.rated_id = ObjectId()
+        # Routes store current_user["_id"], which is already a string
+        self.history = [
+            {"_id": ObjectId(), "user_id": self.user_id, "outfit_items": self.older_items,
+             "rating": 4, "is_favorite": False, "created_at": 1},
+            {"_id": self.rated_id, "user_id": self.user_id, "outfit_items": self.rated_items,
+             "rating": 5, "is_favorite": False, "created_at": 2},
+        ]
+
+    async def _rate(self, users):
+        db = FakeDatabase(users, self.history)
+        with patch.object(service_module.Database, "get_database", return_value=db):
+            await PersonalizedAIService().update_taste_vector(
+                self.user_id, self.rated_items, rating=5, history_id=self.rated_id
+            )
+        return users[0]["taste_vector"]
+
+    async def test_first_rating_seeds_from_string_keyed_history(self):
+        taste_vector = await self._rate([{"_id": self.user_oid}])
+
+        # Older row replayed once, rated outfit applied once
+        self.assertEqual(taste_vector["events"], 2)
+        self.assertAlmostEqual(taste_vector["colors"]["blue"], 0.15)
+        self.assertAlmostEqual(taste_vector["colors"]["red"], 0.15 * 0.8 * 0.95)
+        self.assertIn("bottom", taste_vector["categories"])
+
+    async def test_empty_vector_is_reseeded(self):
+        empty = {"colors": {}, "categories": {}, "events": 0}
+        taste_vector = await self._rate([{"_id": self.user_oid, "taste_vector": empty}])
+
+        self.assertEqual(taste_vector["events"], 2)
+        self.assertIn("red", taste_vector["colors"])
+
+
+class TasteVectorPreferencesTest(unittest.IsolatedAsyncioTestCase):
+    async def test_preferences_match_full_history_analysis(self):
+        service = PersonalizedAIService()
+        history = [
+            {"outfit_items": [{"id": "a", "color": "Red", "category": "Top"},
+                              {"id": "b", "color": "Blue", "category": "Bottom"}],
+             "rating": 4, "is_favorite": False, "occasion": "work"},
+            {"outfit_items": [{"id": "a", "color": "Red", "category": "Top"},
+                              {"id": "c", "color": "Black", "category": "Shoes"}],
+             "rating": None, "is_favorite": True, "occasion": "casual"},
+            {"outfit_items": [{"id": "b", "color": "Blue", "category": "Bottom"}],
+             "rating": 2, "is_favorite": False},
+        ]
+
+        expected = await service._analyze_user_history(history, [])
+        preferences = service._preferences_from_taste_vector(service._build_taste_vector(history))
+
+        for key in ("preferred_combinations", "most_worn_items", "occasion_preferences",
+                    "most_worn_categories", "average_ratings"):
+            self.assertEqual(preferences[key], expected[key], key)
+
+    async def test_null_fields_are_skipped_like_the_aggregation(self):
+        service = PersonalizedAIService()
+        history = [
+            {"outfit_items": [{"id": None, "color": None, "category": None},
+                              {"id": "a", "color": "Red", "category": "Top"}],
+             "rating": 4, "is_favorite": False, "occasion": None},
+            {"outfit_items": [{"id": "a", "color": "Red", "category": "Top"}],
+             "rating": None, "is_favorite": False},
+        ]
+
+        expected = await service._analyze_user_history(history, [])
+        preferences = service._preferences_from_taste_vector(service._build_taste_vector(history))
+
+        self.assertEqual(expected["most_worn_categories"], {"top": 2})
+        self.assertEqual(expected["most_worn_items"], {"a": 2})
+        self.assertEqual(expected["occasion_preferences"], {"casual": 1.0})
+        for key in ("most_worn_items", "occasion_preferences", "most_worn_categories"):
+            self.assertEqual(preferences[key], expected[key], key)
+
+    async def test_rerating_swaps_the_color_rating(self):
+        service = PersonalizedAIService()
+        items = [{"id": "a", "color": "Red", "category": "Top"}]
+        taste_vector = service._build_taste_vector(
+            [{"outfit_items": items, "rating": 2, "is_favorite": False, "occasion": "work"}]
+        )
+
+        service._count_taste_event(taste_vector, items, "work", 5, previous_rating=2, is_new=False)
+
+        self.assertEqual(taste_vector["color_ratings"]["red"], [5, 1])
+        self.assertEqual(taste_vector["items"], {"a": 1})
+        self.assertEqual(taste_vector["occasions"], {"work": 1})
+
+
+class TasteVectorConcurrencyTest(unittest.IsolatedAsyncioTestCase):
+    async def test_conflicting_write_is_retried_not_overwritten(self):
+        service = PersonalizedAIService()
+        user_oid = ObjectId()
+        items = [{"id": "a", "color": "Red", "category": "Top"}]
+        seeded = service._build_taste_vector(
+            [{"outfit_items": items, "rating": 4, "is_favorite": False, "occasion": "work"}]
+        )
+        users = [{"_id": user_oid, "taste_vector": seeded}]
+        db = FakeDatabase(users, [])
+
+        # Another update lands between this update's read and write
+        find_one = db.users.find_one
+        async def racing_find_one(query, projection=None):
+            user = await find_one(query, projection)
+            db.users.find_one = find_one
+            stored = users[0]["taste_vector"]
+            stored["items"] = {"a": 1, "z": 1}
+            stored["events"] += 1
+            return user
+        db.users.find_one = racing_find_one
+
+        with patch.object(service_module.Database, "get_database", return_value=db):
+            await service.update_taste_vector(str(user_oid), items, rating=5, occasion="work")
+
+        taste_vector = users[0]["taste_vector"]
+        self.assertEqual(taste_vector["events"], 3)
+        self.assertEqual(taste_vector["items"], {"a": 2, "z": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()